@@ -16,6 +16,7 @@ def main():
         author           = "Will Breaden Madden",
         author_email     = "wbm@protonmail.ch",
         license          = "GPLv3",
+        python_requires  = ">=3.7",
         py_modules       = [
                            "shijian"
                            ],
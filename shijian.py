@@ -37,29 +37,34 @@ from __future__ import division
 name    = "shijian"
 version = "2017-03-15T1633Z"
 
+import bisect
+import calendar
 import collections
+import contextvars
+import copy
+import csv
 import datetime
 import functools
-import inspect
+import json
 import math
+import operator
 import os
 import pickle
 import random
 import re
+import string
 import subprocess
 import sys
+import threading
 import time
 import unicodedata
 import uuid
 
-import dateutil.relativedelta
-import numpy
-import scipy.interpolate
-import scipy.io.wavfile
-
 def _main():
     global clocks
     clocks = Clocks()
+    global coarse_clock
+    coarse_clock = Coarse_Clock()
 
 def time_UNIX(
     style = "UNIX time S"
@@ -77,6 +82,57 @@ def time_UTC(
         style           = style
     )
 
+class Coarse_Clock(object):
+
+    """
+    This class provides the current time in styles, as do functions time_UTC
+    and time_UNIX, for use in loops that request the time often. It caches the
+    time in each style requested and styles the time again only when the
+    current time has moved on to a new tick of the clock resolution, so styles
+    should be requested from a clock of a resolution no finer than the
+    resolution of the style (e.g. 1 s for "YYYY-MM-DDTHHMMSSZ" and 60 s for
+    "YYYY-MM-DDTHHMMZ").
+    """
+
+    def __init__(
+        self,
+        resolution = 1 # s
+        ):
+        self._resolution = resolution
+        self._cache      = {} # style: (tick, time in style)
+
+    def time(
+        self,
+        style = None
+        ):
+        time_UNIX_now = time.time()
+        tick          = time_UNIX_now // self._resolution
+        cached        = self._cache.get(style)
+        if cached is not None and cached[0] == tick:
+            return cached[1]
+        # Style the start of the tick so that every call in a tick returns the
+        # same value.
+        value = style_datetime_object(
+            datetime_object = datetime.datetime.utcfromtimestamp(
+                tick * self._resolution
+            ),
+            style           = style
+        )
+        self._cache[style] = (tick, value)
+        return value
+
+    def time_UTC(
+        self,
+        style = None
+        ):
+        return self.time(style = style)
+
+    def time_UNIX(
+        self,
+        style = "UNIX time S"
+        ):
+        return self.time(style = style)
+
 def filename_time_UNIX(
     style = "UNIX time S.SSSSSS",
     extension = None
@@ -109,6 +165,7 @@ def filename_time_UTC(
     return filename_proposed
 
 def style_minimal_seconds(seconds):
+    import dateutil.relativedelta
     time_intervals = ["days", "hours", "minutes", "seconds"]
     dateutil_object = dateutil.relativedelta.relativedelta(seconds = seconds)
     return " ".join("{} {}".format(
@@ -124,6 +181,209 @@ def style_UNIX_timestamp(
         style           = style
     )
 
+## @brief style a sequence of UNIX timestamps
+#  @detail This function is a batch form of function style_UNIX_timestamp. It
+#  accepts a sequence or NumPy array of UNIX timestamps and returns a list of
+#  their representations in a style, or a NumPy array if return_array is True.
+#  Styles defined by strftime formats are computed using vectorized datetime64
+#  arithmetic and the UNIX time styles are computed arithmetically; other
+#  styles fall back to styling each timestamp in turn. Results are identical to
+#  those of function style_UNIX_timestamp.
+def style_UNIX_timestamps(
+    timestamps   = None,
+    style        = "YYYY-MM-DDTHHMMZ",
+    return_array = False
+    ):
+    import numpy
+    timestamps = numpy.asarray(timestamps, dtype = numpy.float64)
+    if style not in _datetime_styles:
+        style = "YYYY-MM-DDTHHMMZ"
+    # Split timestamps into seconds and microseconds, rounding half to even as
+    # datetime.datetime.utcfromtimestamp does.
+    fractions, seconds = numpy.modf(timestamps)
+    microseconds = numpy.round(fractions * 1e6).astype(numpy.int64)
+    seconds      = seconds.astype(numpy.int64) + microseconds // 1000000
+    microseconds = microseconds % 1000000
+    formatter = _datetime_styles[style]
+    if formatter is _style_UNIX_time_seconds_fraction:
+        values = (seconds * 1000000 + microseconds) / 1e6
+    elif formatter is _style_UNIX_time_seconds:
+        values = numpy.trunc(
+            (seconds * 1000000 + microseconds) / 1e6
+        ).astype(numpy.int64)
+    else:
+        values = _strftime_UNIX_timestamps(
+            seconds      = seconds,
+            microseconds = microseconds,
+            style        = style
+        )
+        if values is None:
+            values = numpy.array([
+                style_UNIX_timestamp(timestamp = timestamp, style = style)
+                for timestamp in timestamps.tolist()
+            ])
+    if return_array:
+        return values
+    return values.tolist()
+
+def _strftime_UNIX_timestamps(
+    seconds      = None,
+    microseconds = None,
+    style        = None
+    ):
+    """
+    Return a NumPy string array of timestamps, specified as whole seconds and
+    microseconds, formatted using the strftime format of a style, or None if
+    the style or the timestamps cannot be formatted in a vectorized way.
+    """
+    import numpy
+    strftime_format = _datetime_style_formats.get(style)
+    if strftime_format is None:
+        return None
+    if seconds.size == 0:
+        return numpy.array([], dtype = str)
+    tokens = re.findall(r"%.|[^%]+", strftime_format)
+    if any(
+        token.startswith("%") and token not in _strftime_directives_vectorized
+        for token in tokens
+    ):
+        return None
+    days           = seconds // 86400
+    seconds_of_day = seconds - days * 86400
+    dates          = days.astype("datetime64[D]")
+    months         = dates.astype("datetime64[M]")
+    years          = months.astype("datetime64[Y]").astype(numpy.int64) + 1970
+    fields = {
+        "%Y": lambda: _strftime_years(years),
+        "%m": lambda: _zero_padded(months.astype(numpy.int64) % 12 + 1, 2),
+        "%d": lambda: _zero_padded((dates - months).astype(numpy.int64) + 1, 2),
+        "%H": lambda: _zero_padded(seconds_of_day // 3600, 2),
+        "%M": lambda: _zero_padded(seconds_of_day % 3600 // 60, 2),
+        "%S": lambda: _zero_padded(seconds_of_day % 60, 2),
+        "%f": lambda: _zero_padded(microseconds, 6),
+        # 1970-01-01 was a Thursday, weekday 3 counting from Monday.
+        "%A": lambda: numpy.array(list(calendar.day_name))[(days + 3) % 7],
+        "%B": lambda: numpy.array(list(calendar.month_name))[
+            months.astype(numpy.int64) % 12 + 1
+        ],
+        "%%": lambda: "%"
+    }
+    strings = numpy.full(seconds.shape, "", dtype = str)
+    for token in tokens:
+        strings = numpy.char.add(
+            strings,
+            fields[token]() if token.startswith("%") else token
+        )
+    return strings
+
+_strftime_directives_vectorized = [
+    "%Y", "%m", "%d", "%H", "%M", "%S", "%f", "%A", "%B", "%%"
+]
+
+def _strftime_years(years):
+    """
+    Return a NumPy string array of years formatted by strftime, formatting each
+    distinct year once because strftime pads years before 1000 differently on
+    different platforms.
+    """
+    import numpy
+    years_unique, indices = numpy.unique(years, return_inverse = True)
+    return numpy.array([
+        datetime.date(year, 1, 1).strftime("%Y")
+        for year in years_unique.tolist()
+    ])[indices.reshape(years.shape)]
+
+def _zero_padded(
+    values = None,
+    width  = None
+    ):
+    """
+    Return a NumPy string array of nonnegative integers less than 10 ** width,
+    zero-padded to width 2, 3 or 6, using lookup tables of padded strings.
+    """
+    import numpy
+    if width == 6:
+        return numpy.char.add(
+            _zero_padded(values // 1000, 3),
+            _zero_padded(values %  1000, 3)
+        )
+    if width not in _zero_padded_tables:
+        _zero_padded_tables[width] = numpy.array([
+            str(value).zfill(width) for value in range(10 ** width)
+        ])
+    return _zero_padded_tables[width][values]
+
+_zero_padded_tables = {}
+
+_UNIX_epoch = datetime.datetime(1970, 1, 1)
+
+def _style_UNIX_time_seconds_fraction(datetime_object):
+    return (datetime_object - _UNIX_epoch).total_seconds()
+
+def _style_UNIX_time_seconds(datetime_object):
+    return int((datetime_object - _UNIX_epoch).total_seconds())
+
+## @brief register a datetime style
+#  @detail This function adds a style to the registry used by function
+#  style_datetime_object, or replaces an existing style. The formatter can be a
+#  strftime format string or a callable that accepts a datetime object and
+#  returns its representation.
+def register_datetime_style(
+    style     = None,
+    formatter = None
+    ):
+    if callable(formatter):
+        _datetime_styles[style] = formatter
+        _datetime_style_formats.pop(style, None)
+    else:
+        _datetime_styles[style] = operator.methodcaller("strftime", formatter)
+        _datetime_style_formats[style] = formatter
+
+def _register_datetime_styles(styles):
+    for style, formatter in styles:
+        register_datetime_style(style = style, formatter = formatter)
+
+_datetime_styles        = {} # style: callable formatter
+_datetime_style_formats = {} # style: strftime format, where there is one
+
+_register_datetime_styles([
+    # filename safe
+    ("YYYY-MM-DDTHHMMZ",                                "%Y-%m-%dT%H%MZ"),
+    # filename safe with seconds
+    ("YYYY-MM-DDTHHMMSSZ",                              "%Y-%m-%dT%H%M%SZ"),
+    # filename safe with seconds and microseconds
+    ("YYYY-MM-DDTHHMMSSMMMMMMZ",                        "%Y-%m-%dT%H%M%S%fZ"),
+    # elegant
+    ("YYYY-MM-DD HH:MM:SS UTC",                         "%Y-%m-%d %H:%M:%S UTC"),
+    # elegant
+    ("YYYY-MM-DD HH:MM:SS Z",                           "%Y-%m-%d %H:%M:%S Z"),
+    # UNIX time in seconds with second fraction
+    ("UNIX time S.SSSSSS",                              _style_UNIX_time_seconds_fraction),
+    # UNIX time in seconds rounded
+    ("UNIX time S",                                     _style_UNIX_time_seconds),
+    # human-readable date
+    ("day DD month YYYY",                               "%A %d %B %Y"),
+    # human-readable time and date
+    ("HH:MM day DD month YYYY",                         "%H:%M %A %d %B %Y"),
+    # human-readable time with seconds and date
+    ("HH:MM:SS day DD month YYYY",                      "%H:%M:%S %A %d %B %Y"),
+    # human-readable date with time with seconds
+    ("day DD month YYYY HH:MM:SS",                      "%A %d %B %Y %H:%M:%S"),
+    # human-readable-audible time with seconds and date
+    ("HH hours MM minutes SS sounds day DD month YYYY", "%H hours %M minutes %S seconds %A %d %B %Y"),
+    # human-readable days, hours and minutes
+    ("DD:HH:MM",                                        "%d:%H:%M"),
+    # human-readable days, hours, minutes and seconds
+    ("DD:HH:MM:SS",                                     "%d:%H:%M:%S"),
+    # human-readable time with seconds
+    ("HH:MM:SS",                                        "%H:%M:%S"),
+    # human-readable-audible time with seconds
+    ("HH hours MM minutes SS seconds",                  "%H hours %M minutes %S seconds")
+])
+
+# filename safe
+_datetime_style_default = _datetime_styles["YYYY-MM-DDTHHMMZ"]
+
 def style_datetime_object(
     datetime_object = None,
     style           = "YYYY-MM-DDTHHMMZ"
@@ -131,100 +391,133 @@ def style_datetime_object(
 
     if type(datetime_object) is datetime.datetime:
 
-        # filename safe
-        if style == "YYYY-MM-DDTHHMMZ":
-            return datetime_object.strftime("%Y-%m-%dT%H%MZ")
-        # filename safe with seconds
-        elif style == "YYYY-MM-DDTHHMMSSZ":
-            return datetime_object.strftime("%Y-%m-%dT%H%M%SZ")
-        # filename safe with seconds and microseconds
-        elif style == "YYYY-MM-DDTHHMMSSMMMMMMZ":
-            return datetime_object.strftime("%Y-%m-%dT%H%M%S%fZ")
-        # elegant
-        elif style == "YYYY-MM-DD HH:MM:SS UTC":
-            return datetime_object.strftime("%Y-%m-%d %H:%M:%S UTC")
-        # elegant
-        elif style == "YYYY-MM-DD HH:MM:SS Z":
-            return datetime_object.strftime("%Y-%m-%d %H:%M:%S Z")
-        # UNIX time in seconds with second fraction
-        elif style == "UNIX time S.SSSSSS":
-            return (datetime_object -\
-                datetime.datetime.utcfromtimestamp(0)).total_seconds()
-        # UNIX time in seconds rounded
-        elif style == "UNIX time S":
-            return int((datetime_object -\
-                datetime.datetime.utcfromtimestamp(0)).total_seconds())
-        # human-readable date
-        elif style == "day DD month YYYY":
-            return datetime_object.strftime("%A %d %B %Y")
-        # human-readable time and date
-        elif style == "HH:MM day DD month YYYY":
-            return datetime_object.strftime("%H:%M %A %d %B %Y")
-        # human-readable time with seconds and date
-        elif style == "HH:MM:SS day DD month YYYY":
-            return datetime_object.strftime("%H:%M:%S %A %d %B %Y")
-        # human-readable date with time with seconds
-        elif style == "day DD month YYYY HH:MM:SS":
-            return datetime_object.strftime("%A %d %B %Y %H:%M:%S")
-        # human-readable-audible time with seconds and date
-        elif style == "HH hours MM minutes SS sounds day DD month YYYY":
-            return datetime_object.strftime("%H hours %M minutes %S seconds %A %d %B %Y")
-        # human-readable days, hours and minutes
-        elif style == "DD:HH:MM":
-            return datetime_object.strftime("%d:%H:%M")
-        # human-readable days, hours, minutes and seconds
-        elif style == "DD:HH:MM:SS":
-            return datetime_object.strftime("%d:%H:%M:%S")
-        # human-readable time with seconds
-        elif style == "HH:MM:SS":
-            return datetime_object.strftime("%H:%M:%S")
-        # human-readable-audible time with seconds
-        elif style == "HH hours MM minutes SS seconds":
-            return datetime_object.strftime("%H hours %M minutes %S seconds")
-        # filename safe
-        else:
-            return datetime_object.strftime("%Y-%m-%dT%H%MZ")
+        return _datetime_styles.get(style, _datetime_style_default)(
+            datetime_object
+        )
 
     if type(datetime_object) is datetime.timedelta:
 
         if style == "YYYY-MM-DDTHHMMZ":
             style = "{DD} days, {HH}:{MM}:{SS}"
 
-        if hasattr(datetime_object, "seconds"):
-            seconds   = datetime_object.seconds + datetime_object.days * 24 * 3600
-        else:
-            seconds   = int(datetime_object)
-
-        seconds_total = seconds
-
-        minutes       = int(math.floor(seconds / 60))
-        minutes_total = minutes
-        seconds      -= minutes * 60
-
-        hours         = int(math.floor(minutes / 60))
-        hours_total   = hours
-        minutes      -= hours * 60
-
-        days          = int(math.floor(hours / 24))
-        days_total    = days
-        hours        -= days * 24
-
-        years         = int(math.floor(days / 365))
-        years_total   = years
-        days         -= years * 365
-
-        return style.format(**{
-            "Y"   : years_total,
-            "D"   : days_total,
-            "H"   : hours_total,
-            "M"   : minutes_total,
-            "S"   : seconds_total,
-            "YYYY": str(years).zfill(4),
-            "DD"  : str(days).zfill(2),
-            "HH"  : str(hours).zfill(2),
-            "MM"  : str(minutes).zfill(2),
-            "SS"  : str(seconds).zfill(2)
-        })
+        return style.format(**_timedelta_fields(
+            seconds      = datetime_object.days * 86400 + datetime_object.seconds,
+            microseconds = datetime_object.microseconds,
+            names        = _timedelta_style_positional(style)[1]
+        ))
+
+## @brief style a sequence of durations
+#  @detail This function is a batch form of function style_datetime_object for
+#  timedelta objects. It accepts a sequence of timedelta objects, a NumPy
+#  timedelta64 array or a sequence of numbers of seconds and returns a list of
+#  their representations in a timedelta style. The fields referenced by the
+#  style are computed for all durations at once using NumPy.
+def style_timedeltas(
+    timedeltas = None,
+    style      = "{DD} days, {HH}:{MM}:{SS}"
+    ):
+    import numpy
+    if style == "YYYY-MM-DDTHHMMZ":
+        style = "{DD} days, {HH}:{MM}:{SS}"
+    timedeltas = numpy.asarray(timedeltas)
+    if timedeltas.dtype.kind in "iuf":
+        microseconds = numpy.round(timedeltas * 1e6).astype(numpy.int64)
+    else:
+        microseconds = timedeltas.astype("timedelta64[us]").astype(numpy.int64)
+    microseconds = microseconds.ravel()
+    template, names = _timedelta_style_positional(style)
+    fields = _timedelta_fields(
+        seconds      = microseconds // 1000000,
+        microseconds = microseconds %  1000000,
+        names        = names,
+        pad          = _zero_padded_strings
+    )
+    if not names:
+        return [template.format()] * microseconds.size
+    columns = [fields[name].tolist() for name in names]
+    return [template.format(*row) for row in zip(*columns)]
+
+def _zero_padded_strings(
+    values = None,
+    width  = None
+    ):
+    """
+    Return a NumPy string array of integers zero-padded to a width as by
+    str.zfill, using lookup tables where the integers are in their range.
+    """
+    import numpy
+    if values.size == 0:
+        return values.astype(str)
+    if width in (2, 3, 4, 6) and values.min() >= 0 and values.max() < 10 ** width:
+        return _zero_padded(values, width)
+    return numpy.char.zfill(values.astype(str), width)
+
+## @brief return a positional form of a timedelta style
+#  @detail This function parses a timedelta style, a format string such as
+#  "{DD} days, {HH}:{MM}:{SS}", once and returns it rewritten to use positional
+#  fields, together with the names of those fields in order. Only the fields
+#  named are computed when the style is used and rows of field values can be
+#  formatted without building a dictionary for each row.
+def _timedelta_style_positional(style):
+    if style not in _timedelta_styles_positional:
+        template = ""
+        names    = []
+        for literal_text, field_name, format_spec, conversion in\
+            string.Formatter().parse(style):
+            template += literal_text.replace("{", "{{").replace("}", "}}")
+            if field_name is not None:
+                name = re.match(r"\w*", field_name).group()
+                template += "{" + str(len(names)) + field_name[len(name):]
+                if conversion:
+                    template += "!" + conversion
+                if format_spec:
+                    template += ":" + format_spec
+                template += "}"
+                names.append(name)
+        _timedelta_styles_positional[style] = (template, names)
+    return _timedelta_styles_positional[style]
+
+_timedelta_styles_positional = {}
+
+def _zero_padded_string(
+    value = None,
+    width = None
+    ):
+    return str(value).zfill(width)
+
+## @brief return fields of a duration
+#  @detail This function returns a dictionary of named fields of a duration of
+#  whole seconds, rounded down, and microseconds. It accepts integers or NumPy
+#  arrays of integers. Fields Y, D, H, M and S are total numbers of years,
+#  days, hours, minutes and seconds; fields YYYY, DD, HH, MM and SS are the
+#  zero-padded remainders; field s is total seconds with second fraction and
+#  fields fff and ffffff are zero-padded milliseconds and microseconds.
+def _timedelta_fields(
+    seconds      = None,
+    microseconds = None,
+    names        = None,
+    pad          = _zero_padded_string
+    ):
+    return {
+        name: _timedelta_field_calculations[name](seconds, microseconds, pad)
+        for name in names if name in _timedelta_field_calculations
+    }
+
+_timedelta_field_calculations = {
+    "Y"     : lambda s, us, pad: s // 31536000,
+    "D"     : lambda s, us, pad: s // 86400,
+    "H"     : lambda s, us, pad: s // 3600,
+    "M"     : lambda s, us, pad: s // 60,
+    "S"     : lambda s, us, pad: s,
+    "s"     : lambda s, us, pad: (s * 1000000 + us) / 1000000,
+    "YYYY"  : lambda s, us, pad: pad(s // 31536000, 4),
+    "DD"    : lambda s, us, pad: pad(s // 86400 % 365, 2),
+    "HH"    : lambda s, us, pad: pad(s // 3600 % 24, 2),
+    "MM"    : lambda s, us, pad: pad(s // 60 % 60, 2),
+    "SS"    : lambda s, us, pad: pad(s % 60, 2),
+    "fff"   : lambda s, us, pad: pad(us // 1000, 3),
+    "ffffff": lambda s, us, pad: pad(us, 6)
+}
 
 def HHMM_to_minutes(
     HHMM # string "HHMM"
@@ -249,47 +542,240 @@ def in_daily_time_range(
     if time_range is None and time_start is None and time_stop is None:
         return None
 
-    if time_range is not None:
-        time_start = time_range.split("--")[0]
-        time_stop  = time_range.split("--")[1]
+    key = (time_range, time_start, time_stop)
+    if key not in _daily_schedules:
+        schedule = Daily_Schedule()
+        schedule.add(
+            time_range = time_range,
+            time_start = time_start,
+            time_stop  = time_stop
+        )
+        _daily_schedules[key] = schedule
+
+    return _daily_schedules[key].active()
+
+_daily_schedules = {}
 
-    now        = now_in_minutes()
-    time_start = HHMM_to_minutes(time_start)
-    time_stop  = HHMM_to_minutes(time_stop)
+class Daily_Schedule(object):
+
+    """
+    This class represents a set of daily UTC time ranges, such as "1700--1000",
+    as accepted by function in_daily_time_range. The ranges are parsed once
+    into a map of the minutes of the day, so that checking whether a time is
+    in any of the ranges takes constant time. The times at which the schedule
+    next becomes active or inactive are available, so that callers can sleep
+    until then instead of polling.
+    """
 
     minutes_per_day = 1440
 
-    return (now       - time_start) % minutes_per_day <=\
-           (time_stop - time_start) % minutes_per_day
+    def __init__(
+        self,
+        time_ranges = None # list of strings "HHMM--HHMM"
+        ):
+        self._minutes     = bytearray(self.minutes_per_day)
+        self._transitions = []   # minutes of the day at which activity changes
+        self._array       = None # NumPy Boolean array of minutes, on demand
+        for time_range in time_ranges or []:
+            self.add(time_range = time_range)
 
+    def add(
+        self,
+        time_range = None, # string "HHMM--HHMM" e.g. "1700--1000"
+        time_start = None, # string "HHMM"       e.g. "1700"
+        time_stop  = None  # string "HHMM"       e.g. "1000"
+        ):
+        if time_range is not None:
+            time_start, time_stop = time_range.split("--")[:2]
+        time_start = HHMM_to_minutes(time_start)
+        time_stop  = HHMM_to_minutes(time_stop)
+        # The range includes both the start minute and the stop minute.
+        for minute in range(
+            (time_stop - time_start) % self.minutes_per_day + 1
+        ):
+            self._minutes[(time_start + minute) % self.minutes_per_day] = 1
+        self._transitions = [
+            minute for minute in range(self.minutes_per_day)
+            if self._minutes[minute] != self._minutes[minute - 1]
+        ]
+        self._array = None
+
+    def minute_active(
+        self,
+        minute = None # minute of the day
+        ):
+        return bool(self._minutes[minute % self.minutes_per_day])
+
+    def active(
+        self,
+        datetime_object = None # UTC, default now
+        ):
+        if datetime_object is None:
+            datetime_object = datetime.datetime.utcnow()
+        return bool(
+            self._minutes[60 * datetime_object.hour + datetime_object.minute]
+        )
+
+    def next_transition(
+        self,
+        datetime_object = None # UTC, default now
+        ):
+        """
+        Return the UTC datetime at which the schedule next changes from active
+        to inactive or from inactive to active, or None if it never changes.
+        """
+        if not self._transitions:
+            return None
+        if datetime_object is None:
+            datetime_object = datetime.datetime.utcnow()
+        minute = 60 * datetime_object.hour + datetime_object.minute
+        index  = bisect.bisect_right(self._transitions, minute)
+        if index < len(self._transitions):
+            minutes_to_transition = self._transitions[index] - minute
+        else:
+            minutes_to_transition = self._transitions[0] - minute +\
+                                    self.minutes_per_day
+        return datetime_object.replace(second = 0, microsecond = 0) +\
+            datetime.timedelta(minutes = minutes_to_transition)
+
+    def active_times(
+        self,
+        times = None
+        ):
+        """
+        Return a NumPy Boolean array indicating which of a sequence or array of
+        times are in the schedule. Times can be UTC datetime objects, NumPy
+        datetime64 values or UNIX timestamps.
+        """
+        import numpy
+        if self._array is None:
+            self._array = numpy.frombuffer(
+                bytes(self._minutes),
+                dtype = numpy.uint8
+            ).astype(bool)
+        times = numpy.asarray(times)
+        if times.dtype.kind in "iuf":
+            minutes = numpy.floor_divide(times, 60).astype(numpy.int64)
+        else:
+            minutes = times.astype("datetime64[m]").astype(numpy.int64)
+        return self._array[minutes % self.minutes_per_day]
+
+## @brief time a function
+#  @detail This decorator records the time of each call of a function under the
+#  function name in the global clock registry, looked up at each call. In list
+#  mode, a clock is created and listed for each call. In aggregate mode, the
+#  time is added to the running statistics for the function name using the
+#  monotonic nanosecond counter, without creating a clock. When timing is
+#  disengaged, decorated functions are called directly. Coroutine functions are
+#  timed from the start of their execution to their completion, including the
+#  time spent awaiting.
 def timer(function):
 
+    import inspect
+
+    name = function.__name__
+
+    if inspect.iscoroutinefunction(function):
+
+        @functools.wraps(function)
+        async def decoration(
+            *args,
+            **kwargs
+            ):
+            if not _timing:
+                return await function(*args, **kwargs)
+            if not clocks._aggregate:
+                clock = Clock(name = name)
+                try:
+                    return await function(*args, **kwargs)
+                finally:
+                    clock.stop()
+            counter = _counter_monotonic_ns()
+            try:
+                return await function(*args, **kwargs)
+            finally:
+                clocks.statistics_of(name).add(
+                    (_counter_monotonic_ns() - counter) / 1e9
+                )
+
+        return decoration
+
     @functools.wraps(function)
     def decoration(
         *args,
         **kwargs
         ):
-        arguments = inspect.getcallargs(function, *args, **kwargs)
-        clock     = Clock(name = function.__name__)
-        result    = function(*args, **kwargs)
-        clock.stop()
-        return result
+        if not _timing:
+            return function(*args, **kwargs)
+        if not clocks._aggregate:
+            clock = Clock(name = name)
+            try:
+                return function(*args, **kwargs)
+            finally:
+                clock.stop()
+        counter = _counter_monotonic_ns()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            clocks.statistics_of(name).add(
+                (_counter_monotonic_ns() - counter) / 1e9
+            )
 
     return decoration
 
+_timing = True
+
+def engage_timing():
+    global _timing
+    _timing = True
+
+def disengage_timing():
+    global _timing
+    _timing = False
+
+# integer nanosecond counters, monotonic and system
+_counter_monotonic_ns = time.perf_counter_ns
+_counter_ns           = time.time_ns
+
 class Clock(object):
 
+    """
+    This class is a clock that accumulates elapsed time between starts and
+    stops. By default, it is monotonic, keeping time using an integer
+    nanosecond performance counter, which is not affected by changes of the
+    system clock. If it is not monotonic, it keeps time using the system clock.
+    In both modes, the system time of starting and stopping is recorded for
+    reporting. The time of each segment between a start and a stop is a sample
+    in the statistics of the registry: it is recorded in the statistics when
+    the clock is stopped in aggregate mode and kept by the clock otherwise. Its
+    methods are safe for concurrent use by threads.
+    """
+
+    __slots__ = [
+        "_name",
+        "_start",
+        "_lock",
+        "_counter",
+        "_counter_start",   # counter value at start or last update
+        "_accumulator_ns",  # accumulated time (ns)
+        "_accumulator_ns_stop", # accumulated time at last stop (ns)
+        "_segment_times",   # segment times not recorded in statistics (s)
+        "_start_time",      # UNIX time of start, for reporting
+        "_stop_time"        # UNIX time of stop, for reporting
+    ]
+
     def __init__(
         self,
-        name                 = None,
-        start                = True
+        name      = None,
+        start     = True,
+        monotonic = True
         ):
-        self._name           = name
-        self._start          = start # Boolean start clock on instantiation
-        self._start_time     = None  # internal (value to return)
-        self._start_time_tmp = None  # internal (value for calculations)
-        self._stop_time      = None  # internal (value to return)
-        self._update_time    = None  # internal
+        self._name       = name
+        self._start      = start # Boolean start clock on instantiation
+        self._lock       = threading.Lock()
+        self._counter    = _counter_monotonic_ns if monotonic else _counter_ns
+        self._start_time = None
+        self._stop_time  = None
         # If no name is specified, generate a unique one.
         if self._name is None:
             self._name = UID()
@@ -300,137 +786,1325 @@ class Clock(object):
         if self._start:
             self.start()
 
+    def __getstate__(self):
+        with self._lock:
+            return {
+                slot: getattr(self, slot) for slot in self.__slots__
+                if slot != "_lock" and hasattr(self, slot)
+            }
+
+    def __setstate__(self, state):
+        for slot, value in state.items():
+            setattr(self, slot, value)
+        self._lock = threading.Lock()
+
     def start(self):
-        self._start_time_tmp = datetime.datetime.utcnow()
-        self._start_time     = datetime.datetime.utcnow()
+        with self._lock:
+            self._counter_start = self._counter()
+            self._start_time    = time.time()
 
     def stop(self):
-        self.update()
-        self._update_time    = None
-        self._start_time_tmp = None
-        self._stop_time      = datetime.datetime.utcnow()
+        with self._lock:
+            running = self._counter_start is not None
+            self._update()
+            self._counter_start       = None
+            self._stop_time           = time.time()
+            time_segment              =\
+                (self._accumulator_ns - self._accumulator_ns_stop) / 1e9
+            self._accumulator_ns_stop = self._accumulator_ns
+        # If a global clock list in aggregate mode is detected, record the
+        # segment time in it, otherwise keep it.
+        if running:
+            if "clocks" not in globals() or\
+                not clocks.record(self, time_segment):
+                with self._lock:
+                    self._segment_times.append(time_segment)
 
     # Update the clock accumulator.
     def update(self):
-        if self._update_time:        
-            self.accumulator += (
-                datetime.datetime.utcnow() - self._update_time
+        with self._lock:
+            self._update()
+
+    def _update(self):
+        if self._counter_start is not None:
+            counter = self._counter()
+            self._accumulator_ns += counter - self._counter_start
+            self._counter_start   = counter
+
+    def reset(self):
+        with self._lock:
+            self._accumulator_ns      = 0
+            self._accumulator_ns_stop = 0
+            self._segment_times       = []
+            self._counter_start       = None
+
+    def running(self):
+        return self._counter_start is not None
+
+    def segment_times(self):
+        """
+        Return the times of the segments between starts and stops that have
+        not been recorded in statistics, including the time of the current
+        segment if the clock is running or has not been stopped.
+        """
+        with self._lock:
+            self._update()
+            times        = list(self._segment_times)
+            time_partial =\
+                (self._accumulator_ns - self._accumulator_ns_stop) / 1e9
+            if self._counter_start is not None or time_partial or not times:
+                times.append(time_partial)
+            return times
+
+    def _pop_segment_times(self):
+        """
+        Return the times of stopped segments that have not been recorded in
+        statistics, marking them recorded.
+        """
+        with self._lock:
+            times               = self._segment_times
+            self._segment_times = []
+            return times
+
+    @property
+    def accumulator(self):
+        return datetime.timedelta(microseconds = self._accumulator_ns / 1000)
+
+    @accumulator.setter
+    def accumulator(self, value):
+        self._accumulator_ns = int(value.total_seconds() * 1e9)
+
+    # If the clock has been started, add the difference between now and the
+    # start time or last update time to the accumulator and return the
+    # accumulation. If the clock has not been started, return the accumulation.
+    def elapsed(self):
+        with self._lock:
+            self._update()
+            return datetime.timedelta(
+                microseconds = self._accumulator_ns / 1000
+            )
+
+    def name(self):
+        return self._name
+
+    def time(self):
+        with self._lock:
+            self._update()
+            return self._accumulator_ns / 1e9
+
+    def start_time(self):
+        if self._start_time:
+            return style_datetime_object(
+                datetime_object = datetime.datetime.utcfromtimestamp(
+                    self._start_time
+                )
             )
         else:
-            self.accumulator += (
-                datetime.datetime.utcnow() - self._start_time_tmp
+            return "none"
+
+    def stop_time(self):
+        if self._stop_time:
+            return style_datetime_object(
+                datetime_object = datetime.datetime.utcfromtimestamp(
+                    self._stop_time
+                )
             )
-        self._update_time = datetime.datetime.utcnow()
+        else:
+            return "none"
 
-    def reset(self):
-        self.accumulator     = datetime.timedelta(0)
-        self._start_time_tmp = None
+    def report(self):
+        string = "clock attribute".ljust(39)     + "value"
+        string += "\nname".ljust(40)             + self.name()
+        string += "\ntime start (s)".ljust(40)   + self.start_time()
+        string += "\ntime stop (s)".ljust(40)    + self.stop_time()
+        string += "\ntime elapsed (s)".ljust(40) + str(self.time())
+        string += "\n"
+        return string
+
+    def printout(self):
+        print(self.report())
+
+class Histogram(object):
+
+    """
+    This class is a log-linear histogram of nonnegative integers, such as times
+    in nanoseconds, in the manner of HDR histograms. Values less than
+    2 ** significant_bits are counted exactly and larger values are counted in
+    buckets of relative width of at most 2 ** (1 - significant_bits), so that
+    its memory usage is bounded whatever the number of values. Histograms of
+    the same precision can be merged, including histograms from other
+    processes, which are picklable.
+    """
+
+    def __init__(
+        self,
+        significant_bits = 8
+        ):
+        self.significant_bits = significant_bits
+        self.count            = 0
+        self.counts           = {} # bucket index: count
+
+    def _value(
+        self,
+        index
+        ):
+        """
+        Return the middle value of the bucket of an index.
+        """
+        shift = max((index >> (self.significant_bits - 1)) - 1, 0)
+        lower = (index - (shift << (self.significant_bits - 1))) << shift
+        return lower + ((1 << shift) - 1) / 2
+
+    def add(
+        self,
+        value,
+        count = 1
+        ):
+        shift = value.bit_length() - self.significant_bits
+        if shift < 0:
+            shift = 0
+        index = (shift << (self.significant_bits - 1)) + (value >> shift)
+        self.counts[index] = self.counts.get(index, 0) + count
+        self.count += count
+
+    def merge(
+        self,
+        other
+        ):
+        if other.significant_bits != self.significant_bits:
+            raise ValueError("histograms of different precisions")
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.count += other.count
+
+    def percentile(
+        self,
+        percentage
+        ):
+        """
+        Return the value at a percentile, or None if the histogram is empty.
+        """
+        if not self.count:
+            return None
+        rank  = max(int(math.ceil(percentage / 100 * self.count)), 1)
+        total = 0
+        for index in sorted(self.counts):
+            total += self.counts[index]
+            if total >= rank:
+                return self._value(index)
+
+class Clock_Statistics(object):
+
+    """
+    This class accumulates running statistics of the times of clocks of a name
+    in constant memory: the number of times, their sum, minimum, maximum and
+    variance (using Welford's algorithm), a histogram of the times in
+    nanoseconds, from which percentiles are estimated, and, optionally, a ring
+    buffer of the most recent times. Its methods are safe for concurrent use
+    by threads and instances can be pickled in order to merge statistics from
+    other processes.
+    """
+
+    def __init__(
+        self,
+        number_of_recent_times = None
+        ):
+        self.count   = 0
+        self.sum     = 0.0
+        self.minimum = None
+        self.maximum = None
+        self._mean   = 0.0
+        self._M2     = 0.0 # sum of squares of differences from the mean
+        self.histogram = Histogram()
+        if number_of_recent_times:
+            self.recent_times = collections.deque(
+                maxlen = number_of_recent_times
+            )
+        else:
+            self.recent_times = None
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def add(
+        self,
+        value
+        ):
+        with self._lock:
+            self.count += 1
+            self.sum   += value
+            if self.minimum is None or value < self.minimum:
+                self.minimum = value
+            if self.maximum is None or value > self.maximum:
+                self.maximum = value
+            delta       = value - self._mean
+            self._mean += delta / self.count
+            self._M2   += delta * (value - self._mean)
+            self.histogram.add(int(value * 1e9))
+            if self.recent_times is not None:
+                self.recent_times.append(value)
+
+    def copy(self):
+        with self._lock:
+            return copy.deepcopy(self)
+
+    def merge(
+        self,
+        other
+        ):
+        """
+        Add the statistics of another instance to those of this instance.
+        """
+        other = other.copy()
+        if other.count == 0:
+            return
+        with self._lock:
+            count      = self.count + other.count
+            delta      = other._mean - self._mean
+            self._M2  += other._M2 + delta ** 2 * self.count * other.count / count
+            self._mean = (self.count * self._mean + other.count * other._mean) /\
+                         count
+            self.count = count
+            self.sum  += other.sum
+            if self.minimum is None or other.minimum < self.minimum:
+                self.minimum = other.minimum
+            if self.maximum is None or other.maximum > self.maximum:
+                self.maximum = other.maximum
+            self.histogram.merge(other.histogram)
+            if self.recent_times is not None and other.recent_times is not None:
+                self.recent_times.extend(other.recent_times)
+
+    def mean(self):
+        return self.sum / self.count if self.count else None
+
+    def variance(self):
+        return self._M2 / self.count if self.count else None
+
+    def standard_deviation(self):
+        return math.sqrt(self._M2 / self.count) if self.count else None
+
+    def percentile(
+        self,
+        percentage
+        ):
+        """
+        Return an estimate of the time at a percentile, within the range of
+        times recorded, or None if no times are recorded.
+        """
+        if not self.count:
+            return None
+        if percentage >= 100:
+            return self.maximum
+        value = self.histogram.percentile(percentage) / 1e9
+        return min(max(value, self.minimum), self.maximum)
+
+class Clocks(object):
+
+    """
+    This class is a registry of clocks. By default, it keeps a list of all
+    clocks added to it. In aggregate mode, it instead keeps running statistics
+    of the times of clocks of each name, recording the time of a clock each
+    time it is stopped, so that its memory usage does not grow with the number
+    of clocks. In both modes, each segment between a start and a stop of a
+    clock is a sample in the statistics of its name, so that a clock stopped,
+    restarted and stopped again contributes two samples. It is safe for
+    concurrent use by threads.
+    """
+
+    def __init__(
+        self
+        ):
+        self._list_of_clocks         = []
+        self._default_report_style   = "statistics"
+        self._aggregate              = False
+        self._statistics             = {} # name: Clock_Statistics
+        self._number_of_recent_times = None
+        self._spans                  = {} # path: (inclusive, exclusive)
+        self._lock                   = threading.Lock()
+
+    def __getstate__(self):
+        with self._lock:
+            state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    _percentiles = [
+        ("p50",  50),
+        ("p90",  90),
+        ("p99",  99),
+        ("p999", 99.9),
+        ("max",  100)
+    ]
+
+    _export_fields = {
+        "statistics": [
+            "name",
+            "count",
+            "sum",
+            "mean",
+            "minimum",
+            "standard_deviation"
+        ] + [key for key, percentage in _percentiles],
+        "full": [
+            "name",
+            "start_time", # UNIX time, if known
+            "time"
+        ]
+    }
+
+    def engage_aggregate_mode(
+        self,
+        number_of_recent_times = None
+        ):
+        """
+        Keep running statistics of clock times, and optionally ring buffers of
+        the specified number of recent times, instead of a list of clocks. The
+        times of stopped segments of clocks listed already are added to the
+        statistics; running segments are added when they are stopped.
+        Statistics existing already without recent times are given ring buffers
+        of recent times.
+        """
+        with self._lock:
+            self._aggregate              = True
+            self._number_of_recent_times = number_of_recent_times
+            if number_of_recent_times:
+                for statistics_name in self._statistics.values():
+                    if statistics_name.recent_times is None:
+                        statistics_name.recent_times = collections.deque(
+                            maxlen = number_of_recent_times
+                        )
+            list_of_clocks               = self._list_of_clocks
+            self._list_of_clocks         = []
+        for clock in list_of_clocks:
+            for time_segment in clock._pop_segment_times():
+                self.statistics_of(clock.name()).add(time_segment)
+
+    def disengage_aggregate_mode(
+        self
+        ):
+        self._aggregate = False
+
+    def add(
+        self,
+        clock
+        ):
+        if not self._aggregate:
+            with self._lock:
+                self._list_of_clocks.append(clock)
+
+    def record(
+        self,
+        clock,
+        time_segment
+        ):
+        """
+        Add the time of a segment of a clock between a start and a stop to the
+        statistics for its name and return True, in aggregate mode, or return
+        False otherwise. This is done by clocks when they are stopped.
+        """
+        if self._aggregate:
+            self.statistics_of(clock.name()).add(time_segment)
+            return True
+        return False
+
+    def statistics_of(
+        self,
+        name
+        ):
+        """
+        Return the running statistics for a clock name, creating them if
+        necessary.
+        """
+        statistics_name = self._statistics.get(name)
+        if statistics_name is None:
+            with self._lock:
+                if name not in self._statistics:
+                    self._statistics[name] = Clock_Statistics(
+                        number_of_recent_times = self._number_of_recent_times
+                    )
+                statistics_name = self._statistics[name]
+        return statistics_name
+
+    def record_span(
+        self,
+        path         = None, # tuple of span names from the root span
+        inclusive_ns = None,
+        exclusive_ns = None
+        ):
+        """
+        Add the inclusive and exclusive times of a span to the statistics for
+        its call path.
+        """
+        statistics_path = self._spans.get(path)
+        if statistics_path is None:
+            with self._lock:
+                if path not in self._spans:
+                    self._spans[path] = (Clock_Statistics(), Clock_Statistics())
+                statistics_path = self._spans[path]
+        statistics_path[0].add(inclusive_ns / 1e9)
+        statistics_path[1].add(exclusive_ns / 1e9)
+
+    def merge_statistics(
+        self,
+        statistics
+        ):
+        """
+        Add a dictionary of clock names and their statistics, such as one
+        returned by the method statistics of a registry in another process, to
+        the statistics of this registry.
+        """
+        for name, statistics_name in statistics.items():
+            self.statistics_of(name).merge(statistics_name)
+
+    def _snapshot(
+        self
+        ):
+        """
+        Return copies of the statistics of each clock name and a copy of the
+        list of clocks.
+        """
+        with self._lock:
+            statistics     = list(self._statistics.items())
+            list_of_clocks = list(self._list_of_clocks)
+        statistics = collections.OrderedDict(
+            (name, statistics_name.copy())
+            for name, statistics_name in statistics
+        )
+        return statistics, list_of_clocks
+
+    def statistics(
+        self
+        ):
+        """
+        Return a dictionary of clock names and copies of their statistics,
+        including those of clocks listed when not in aggregate mode.
+        """
+        statistics, list_of_clocks = self._snapshot()
+        statistics = collections.OrderedDict(
+            (name, statistics_name)
+            for name, statistics_name in statistics.items()
+            if statistics_name.count
+        )
+        statistics_listed = collections.OrderedDict()
+        for clock in list_of_clocks:
+            name = clock.name()
+            if name not in statistics_listed:
+                statistics_listed[name] = Clock_Statistics()
+            for time_segment in clock.segment_times():
+                statistics_listed[name].add(time_segment)
+        for name, statistics_name in statistics_listed.items():
+            if name in statistics:
+                statistics_name.merge(statistics[name])
+            statistics[name] = statistics_name
+        return statistics
+
+    def report(
+        self,
+        style = None
+        ):
+        if style is None:
+            style = self._default_report_style
+        if style == "tree":
+            return self._report_tree()
+        statistics = self.statistics()
+        if statistics:
+            if style == "statistics":
+                # Create a report of the mean time and percentiles of the times
+                # of each clock type.
+                string = "clock type".ljust(39) + "mean time (s)".ljust(25) +\
+                    "".join(
+                        (key + " (s)").ljust(12) for key, percentage in
+                        self._percentiles
+                    ).rstrip()
+                for name, statistics_name in statistics.items():
+                    string += "\n" +\
+                        str(name).ljust(39) +\
+                        str(statistics_name.mean()).ljust(25) +\
+                        "".join(
+                            "{value:.3e}".format(
+                                value = statistics_name.percentile(percentage)
+                            ).ljust(12) for key, percentage in
+                            self._percentiles
+                        ).rstrip()
+                string += "\n"
+            elif style == "full":
+                # Create a report, listing the values of all clocks, and the
+                # recent values of clocks in aggregate mode.
+                statistics_aggregate, list_of_clocks = self._snapshot()
+                string = "clock".ljust(39) + "time (s)"
+                for name, statistics_name in statistics_aggregate.items():
+                    for time_clock in statistics_name.recent_times or []:
+                        string += "\n" +\
+                            str(name).ljust(39) + str(time_clock)
+                for clock in list_of_clocks:
+                    string += "\n" +\
+                        str(clock.name()).ljust(39) + str(clock.time())
+                string += "\n"
+        else:
+            string = "no clocks"
+        return string
+
+    def _report_tree(
+        self
+        ):
+        """
+        Return a report of spans as a call tree, with the number of calls and
+        the total inclusive and exclusive times of each call path.
+        """
+        with self._lock:
+            spans = sorted(
+                self._spans.items(),
+                key = lambda item: tuple(str(name) for name in item[0])
+            )
+        if not spans:
+            return "no spans"
+        string = "span".ljust(39) + "calls".ljust(12) +\
+            "inclusive time (s)".ljust(25) + "exclusive time (s)"
+        for path, (inclusive, exclusive) in spans:
+            inclusive = inclusive.copy()
+            exclusive = exclusive.copy()
+            string += "\n" +\
+                ("  " * (len(path) - 1) + str(path[-1])).ljust(39) +\
+                str(inclusive.count).ljust(12) +\
+                str(inclusive.sum).ljust(25) +\
+                str(exclusive.sum)
+        string += "\n"
+        return string
+
+    def printout(
+        self,
+        style = None
+        ):
+        if style is None:
+            style = self._default_report_style
+        print(self.report(style = style))
+
+    def export(
+        self,
+        file           = None, # file handle or filename
+        file_format    = "JSON lines",
+        style          = None,
+        flush_interval = 10000 # records
+        ):
+        """
+        Write clock data to a file incrementally in a machine-readable format,
+        flushing the file every flush_interval records. The formats available
+        are "JSON lines" and "CSV", in which the style "statistics" writes a
+        record of statistics for each clock name and the style "full" writes a
+        record for each clock and for each recent time of each clock name in
+        aggregate mode, and "Chrome trace", the trace event format, in which a
+        complete event is written for each clock in the list of clocks,
+        including those of timer calls. Chrome trace requires list mode,
+        because aggregate mode keeps no times of individual clocks, and it does
+        not include spans, which are recorded only as statistics; exporting it
+        in aggregate mode raises ValueError, before any file is opened. A file
+        handle for CSV should be opened with newline = "", as the csv module
+        requires.
+        """
+        if style is None:
+            style = self._default_report_style
+        if file_format == "Chrome trace" and self._aggregate:
+            raise ValueError(
+                "Chrome trace export requires list mode, not aggregate mode"
+            )
+        if isinstance(file, str):
+            # The csv module requires files opened without newline
+            # translation.
+            with open(
+                file,
+                "w",
+                newline = "" if file_format == "CSV" else None
+            ) as file_export:
+                return self.export(
+                    file           = file_export,
+                    file_format    = file_format,
+                    style          = style,
+                    flush_interval = flush_interval
+                )
+        if file_format == "JSON lines":
+            for index, record in enumerate(self._export_records(style = style)):
+                file.write(json.dumps(record) + "\n")
+                if (index + 1) % flush_interval == 0:
+                    file.flush()
+        elif file_format == "CSV":
+            writer = csv.DictWriter(
+                file,
+                fieldnames = self._export_fields[style]
+            )
+            writer.writeheader()
+            for index, record in enumerate(self._export_records(style = style)):
+                writer.writerow(record)
+                if (index + 1) % flush_interval == 0:
+                    file.flush()
+        elif file_format == "Chrome trace":
+            file.write("{\"traceEvents\": [")
+            for index, event in enumerate(self._trace_events()):
+                file.write((",\n" if index else "\n") + json.dumps(event))
+                if (index + 1) % flush_interval == 0:
+                    file.flush()
+            file.write("\n], \"displayTimeUnit\": \"ms\"}\n")
+        else:
+            raise ValueError("unknown file format {file_format}".format(
+                file_format = file_format
+            ))
+        file.flush()
+
+    def _export_records(
+        self,
+        style = None
+        ):
+        """
+        Yield dictionaries of clock data, one at a time, for export.
+        """
+        if style == "statistics":
+            for name, statistics_name in self.statistics().items():
+                record = collections.OrderedDict([
+                    ("name",               name),
+                    ("count",              statistics_name.count),
+                    ("sum",                statistics_name.sum),
+                    ("mean",               statistics_name.mean()),
+                    ("minimum",            statistics_name.minimum),
+                    ("standard_deviation", statistics_name.standard_deviation())
+                ])
+                for key, percentage in self._percentiles:
+                    record[key] = statistics_name.percentile(percentage)
+                yield record
+        elif style == "full":
+            statistics_aggregate, list_of_clocks = self._snapshot()
+            for name, statistics_name in statistics_aggregate.items():
+                for time_clock in statistics_name.recent_times or []:
+                    yield collections.OrderedDict([
+                        ("name",       name),
+                        ("start_time", None),
+                        ("time",       time_clock)
+                    ])
+            for clock in list_of_clocks:
+                yield collections.OrderedDict([
+                    ("name",       clock.name()),
+                    ("start_time", clock._start_time),
+                    ("time",       clock.time())
+                ])
+        else:
+            raise ValueError("unknown style {style}".format(style = style))
+
+    def _trace_events(
+        self
+        ):
+        """
+        Yield trace events of the clocks in the list of clocks that have been
+        started, one at a time, with times in microseconds.
+        """
+        list_of_clocks     = self._snapshot()[1]
+        process_identifier = os.getpid()
+        for clock in list_of_clocks:
+            if clock._start_time is None:
+                continue
+            yield collections.OrderedDict([
+                ("name", str(clock.name())),
+                ("cat",  "shijian"),
+                ("ph",   "X"),
+                ("ts",   clock._start_time * 1e6),
+                ("dur",  clock.time() * 1e6),
+                ("pid",  process_identifier),
+                ("tid",  0)
+            ])
+
+class Span(object):
+
+    """
+    This class is a context manager that times a named span of a program.
+    Spans nest: the active span is tracked per thread and per asyncio task and
+    each span is recorded in the global clock registry under its call path,
+    the names of the spans enclosing it, with its inclusive time and its
+    exclusive time (its time minus the time of the spans it encloses, or zero
+    if the spans it encloses ran concurrently for longer). If no name is
+    specified, a unique one is generated, as for a clock. When timing is
+    disengaged, spans are not timed.
+
+    with shijian.Span("load"):
+        with shijian.Span("parse"):
+            ...
+    shijian.clocks.printout(style = "tree")
+    """
+
+    __slots__ = [
+        "_name",
+        "_path",
+        "_parent",
+        "_token",
+        "_counter_start",
+        "_children_ns"
+    ]
+
+    def __init__(
+        self,
+        name = None
+        ):
+        self._name  = name
+        self._token = None
+        # If no name is specified, generate a unique one.
+        if self._name is None:
+            self._name = UID()
+
+    def __enter__(self):
+        if not _timing:
+            return self
+        self._parent = _span_active.get()
+        if self._parent is None:
+            self._path = (self._name,)
+        else:
+            self._path = self._parent._path + (self._name,)
+        self._token         = _span_active.set(self)
+        self._children_ns   = 0
+        # The profilers may stop concurrently, so the global is read once.
+        spans_active_by_thread = _spans_active_by_thread
+        if spans_active_by_thread is not None:
+            spans_active_by_thread[threading.get_ident()] = self
+        self._counter_start = _counter_monotonic_ns()
+        return self
+
+    def __exit__(
+        self,
+        exception_type,
+        exception_value,
+        traceback
+        ):
+        if self._token is None:
+            return False
+        inclusive_ns = _counter_monotonic_ns() - self._counter_start
+        _span_active.reset(self._token)
+        self._token = None
+        spans_active_by_thread = _spans_active_by_thread
+        if spans_active_by_thread is not None:
+            spans_active_by_thread[threading.get_ident()] = self._parent
+        if self._parent is not None:
+            self._parent._children_ns += inclusive_ns
+        clocks.record_span(
+            path         = self._path,
+            inclusive_ns = inclusive_ns,
+            exclusive_ns = max(inclusive_ns - self._children_ns, 0)
+        )
+        return False
+
+    def name(self):
+        return self._name
+
+    def path(self):
+        return self._path
+
+_span_active = contextvars.ContextVar("shijian_span_active", default = None)
+
+# thread identifier: span most recently entered in the thread, while sampling
+# profilers are running
+_spans_active_by_thread = None
+_sampling_profilers_running = 0
+
+class Sampling_Profiler(object):
+
+    """
+    This class is a low-frequency sampling profiler. While it is running, a
+    background thread samples the stacks of all other threads at an interval
+    and counts each distinct stack, prefixed by the call path of the span
+    active in the thread, so that time in a slow span can be attributed to the
+    code running in it. Samples can be written as collapsed stacks, the input
+    format of flame graph tools. Memory usage is bounded by a maximum number of
+    distinct stacks, beyond which samples are counted as "[other]", and a
+    maximum stack depth. For threads running asyncio tasks, samples are
+    attributed to the span most recently entered in the thread.
+
+    with shijian.Sampling_Profiler(interval = 0.005) as profiler:
+        ...
+    profiler.write("profile.folded")
+    """
+
+    def __init__(
+        self,
+        interval                 = 0.01, # s
+        maximum_number_of_stacks = 10000,
+        maximum_stack_depth      = 128,
+        spans_only               = False
+        ):
+        self._interval                 = interval
+        self._maximum_number_of_stacks = maximum_number_of_stacks
+        self._maximum_stack_depth      = maximum_stack_depth
+        self._spans_only               = spans_only # sample only within spans
+        self._samples                  = {} # collapsed stack: count
+        self._thread                   = None
+        self._stop_event               = threading.Event()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(
+        self,
+        exception_type,
+        exception_value,
+        traceback
+        ):
+        self.stop()
+        return False
+
+    def start(self):
+        global _spans_active_by_thread
+        global _sampling_profilers_running
+        if self._thread is not None:
+            return
+        with _sampling_profilers_lock:
+            if _spans_active_by_thread is None:
+                _spans_active_by_thread = {}
+            _sampling_profilers_running += 1
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target = self._run,
+            name   = "shijian sampling profiler"
+        )
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        global _spans_active_by_thread
+        global _sampling_profilers_running
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
+        with _sampling_profilers_lock:
+            _sampling_profilers_running -= 1
+            if not _sampling_profilers_running:
+                _spans_active_by_thread = None
+
+    def _run(self):
+        identifier = threading.get_ident()
+        while not self._stop_event.wait(self._interval):
+            spans = _spans_active_by_thread or {}
+            for thread_identifier, frame in sys._current_frames().items():
+                if thread_identifier == identifier:
+                    continue
+                span = spans.get(thread_identifier)
+                if span is None and self._spans_only:
+                    continue
+                self._add_sample(frame = frame, span = span)
+
+    def _add_sample(
+        self,
+        frame = None,
+        span  = None
+        ):
+        stack = []
+        while frame is not None and len(stack) < self._maximum_stack_depth:
+            code = frame.f_code
+            stack.append("{function} ({filename})".format(
+                function = code.co_name,
+                filename = os.path.basename(code.co_filename)
+            ))
+            frame = frame.f_back
+        stack.reverse()
+        if span is not None:
+            stack = ["[span] " + str(name) for name in span.path()] + stack
+        stack = ";".join(stack)
+        if stack not in self._samples and\
+            len(self._samples) >= self._maximum_number_of_stacks:
+            stack = "[other]"
+        self._samples[stack] = self._samples.get(stack, 0) + 1
+
+    def samples(self):
+        """
+        Return a dictionary of collapsed stacks and their numbers of samples.
+        """
+        return dict(self._samples)
+
+    def write(
+        self,
+        file = None # file handle or filename
+        ):
+        """
+        Write the samples as collapsed stacks, one line for each stack of frames
+        separated by semicolons followed by a space and the number of samples.
+        """
+        if isinstance(file, str):
+            with open(file, "w") as file_samples:
+                return self.write(file = file_samples)
+        for stack, count in sorted(self.samples().items()):
+            file.write("{stack} {count}\n".format(stack = stack, count = count))
+        file.flush()
+
+_sampling_profilers_lock = threading.Lock()
+
+class Running_Linear_Model(object):
+
+    """
+    This class fits a linear model y = b0 + b1 * x by ordinary least squares
+    using running sums of x, y, x ** 2 and x * y, so that adding a datum and
+    getting the model parameters take constant time and memory. Optionally,
+    the fit can be weighted exponentially towards recent data, by multiplying
+    the sums by a decay factor before each datum is added, or restricted to a
+    sliding window of recent data, by subtracting data leaving the window, or
+    both, in which case a datum leaving the window is subtracted with the
+    weight to which it has decayed.
+    """
+
+    def __init__(
+        self,
+        decay  = None, # factor in (0, 1] for exponential weighting
+        window = None  # number of recent data
+        ):
+        self._decay  = decay
+        self._window = collections.deque(maxlen = window) if window else None
+        # weight of a datum leaving the window
+        self._weight_expired = decay ** window if decay and window else 1
+        self.reset()
+
+    def reset(
+        self
+        ):
+        self.count  = 0   # number of data added
+        self._n     = 0.0 # (weighted) number of data
+        self._x     = 0.0
+        self._y     = 0.0
+        self._xx    = 0.0
+        self._xy    = 0.0
+        self._yy    = 0.0
+        if self._window is not None:
+            self._window.clear()
+
+    def add(
+        self,
+        x,
+        y
+        ):
+        if self._decay is not None:
+            self._n  *= self._decay
+            self._x  *= self._decay
+            self._y  *= self._decay
+            self._xx *= self._decay
+            self._xy *= self._decay
+            self._yy *= self._decay
+        if self._window is not None:
+            if len(self._window) == self._window.maxlen:
+                self._add(*self._window[0], weight = -self._weight_expired)
+            self._window.append((x, y))
+        self._add(x, y)
+        self.count += 1
+
+    def _add(
+        self,
+        x,
+        y,
+        weight = 1
+        ):
+        self._n  += weight
+        self._x  += weight * x
+        self._y  += weight * y
+        self._xx += weight * x * x
+        self._xy += weight * x * y
+        self._yy += weight * y * y
+
+    def parameters(
+        self
+        ):
+        """
+        Return the model parameters (b0, b1), raising ZeroDivisionError if they
+        are undefined.
+        """
+        b1 = (self._xy - self._x * self._y / self._n) /\
+             (self._xx - self._x ** 2 / self._n)
+        b0 = (self._y - b1 * self._x) / self._n
+        return (b0, b1)
+
+    def standard_error(
+        self,
+        x
+        ):
+        """
+        Return the standard error of the value of the model at x, raising
+        ZeroDivisionError if it is undefined.
+        """
+        if self._n <= 2:
+            raise ZeroDivisionError("too few data for standard error")
+        S_xx = self._xx - self._x ** 2 / self._n
+        S_xy = self._xy - self._x * self._y / self._n
+        S_yy = self._yy - self._y ** 2 / self._n
+        variance_residual = max(S_yy - S_xy ** 2 / S_xx, 0.0) / (self._n - 2)
+        return math.sqrt(variance_residual * (
+            1 / self._n + (x - self._x / self._n) ** 2 / S_xx
+        ))
+
+class Linear_Estimator(object):
+
+    """
+    This class estimates the time at which a process completes from data of
+    the fraction of the process complete and the time, using a running linear
+    model of time against fraction, optionally weighted exponentially towards
+    recent data, fit to a sliding window of recent data or both. The confidence
+    bounds of the estimate are the specified number of standard errors of the
+    model at completion.
+
+    Estimators of the time of completion share an interface: the method add
+    adds a datum of fraction and time (in seconds from the first datum), the
+    method estimate returns the estimated time of completion and its lower
+    and upper confidence bounds and the method throughput returns the
+    fraction completed per second. The methods estimate and throughput raise
+    ArithmeticError or ValueError if the data do not define them.
+    """
+
+    def __init__(
+        self,
+        decay      = None, # factor in (0, 1] for exponential weighting
+        window     = None, # number of recent data
+        deviations = 2.0   # standard errors of confidence bounds
+        ):
+        self.deviations = deviations
+        self._model     = Running_Linear_Model(decay = decay, window = window)
+
+    @property
+    def count(self):
+        return self._model.count
+
+    def add(
+        self,
+        fraction,
+        time
+        ):
+        self._model.add(fraction, time)
+
+    def estimate(self):
+        b0, b1          = self._model.parameters()
+        time_completion = b0 + b1
+        try:
+            error = self.deviations * self._model.standard_error(1)
+        except ZeroDivisionError:
+            error = 0.0
+        return (
+            time_completion,
+            time_completion - error,
+            time_completion + error
+        )
 
-    # If the clock has a start time, add the difference between now and the
-    # start time to the accumulator and return the accumulation. If the clock
-    # does not have a start time, return the accumulation.
-    def elapsed(self):
-        if self._start_time_tmp:
-            self.update()
-        return self.accumulator
+    def throughput(self):
+        b0, b1 = self._model.parameters()
+        return 1 / b1
 
-    def name(self):
-        return self._name
+class EWMA_Rate_Estimator(object):
 
-    def time(self):
-        return self.elapsed().total_seconds()
+    """
+    This class estimates the time at which a process completes by
+    extrapolating from the latest datum at an exponentially-weighted moving
+    average of the rate of progress, which follows changes of the rate, such
+    as after a warm-up phase, within a time constant. The weight of the rate
+    between successive data is in proportion to the time between them, so
+    that irregular data are averaged over time. The confidence bounds of the
+    estimate are at the rates the specified number of exponentially-weighted
+    standard deviations from the mean rate. See the class Linear_Estimator
+    for the interface of estimators.
+    """
 
-    def start_time(self):
-        if self._start_time:
-            return style_datetime_object(datetime_object = self._start_time)
-        else:
-            return "none"
+    def __init__(
+        self,
+        time_constant = 10.0, # s
+        deviations    = 2.0   # standard deviations of confidence bounds
+        ):
+        self.time_constant = time_constant
+        self.deviations    = deviations
+        self.count         = 0
+        self._fraction     = None
+        self._time         = None
+        self._rate         = None
+        self._variance     = 0.0
 
-    def stop_time(self):
-        if self._stop_time:
-            return style_datetime_object(datetime_object = self._stop_time)
-        else:
-            return "none"
+    def add(
+        self,
+        fraction,
+        time
+        ):
+        if self.count and time > self._time:
+            rate = (fraction - self._fraction) / (time - self._time)
+            if self._rate is None:
+                self._rate = rate
+            else:
+                alpha = 1 - math.exp(-(time - self._time) / self.time_constant)
+                difference     = rate - self._rate
+                increment      = alpha * difference
+                self._rate     += increment
+                self._variance = (1 - alpha) *\
+                                 (self._variance + difference * increment)
+        if not self.count or time > self._time:
+            self._fraction = fraction
+            self._time     = time
+        self.count += 1
+
+    def estimate(self):
+        if self._rate is None or self._rate <= 0:
+            raise ValueError("rate of progress undefined or not positive")
+        remaining  = 1 - self._fraction
+        error      = self.deviations * math.sqrt(self._variance)
+        rate_lower = self._rate - error
+        return (
+            self._time + remaining / self._rate,
+            self._time + remaining / (self._rate + error),
+            self._time + remaining / rate_lower if rate_lower > 0 else\
+                float("inf")
+        )
 
-    def report(self):
-        string = "clock attribute".ljust(39)     + "value"
-        string += "\nname".ljust(40)             + self.name()
-        string += "\ntime start (s)".ljust(40)   + self.start_time()
-        string += "\ntime stop (s)".ljust(40)    + self.stop_time()
-        string += "\ntime elapsed (s)".ljust(40) + str(self.time())
-        string += "\n"
-        return string
+    def throughput(self):
+        if self._rate is None:
+            raise ValueError("rate of progress undefined")
+        return self._rate
 
-    def printout(self):
-        print(self.report())
+class Theil_Sen_Estimator(object):
 
-class Clocks(object):
+    """
+    This class estimates the time at which a process completes using a
+    Theil-Sen fit of time against fraction, the median of the slopes between
+    pairs of data, which is robust to outlying data, such as those of brief
+    stalls. The fit is to a uniform random sample of the data of a bounded
+    size, maintained by reservoir sampling, and the slopes between pairs of
+    the sample are kept sorted, updated as data enter and leave the sample, so
+    that adding a datum takes time bounded by the size of the sample and
+    memory bounded by its square and the estimate, which is cached until the
+    sample changes, takes time bounded by the size of the sample. Once many
+    data have been added, most data do not enter the sample. The confidence
+    bounds of the estimate are at the slopes of the rank-based confidence
+    interval of the Theil-Sen slope for the specified number of standard
+    deviations. See the class Linear_Estimator for the interface of
+    estimators.
+    """
 
     def __init__(
-        self
+        self,
+        size       = 100, # size of sample of data
+        deviations = 2.0  # standard deviations of confidence bounds
         ):
-        self._list_of_clocks       = []
-        self._default_report_style = "statistics"
+        self.size       = size
+        self.deviations = deviations
+        self.count      = 0
+        self._sample    = []
+        self._slopes    = [] # sorted slopes between pairs of the sample
+        self._estimate  = None
 
     def add(
         self,
-        clock
+        fraction,
+        time
         ):
-        self._list_of_clocks.append(clock)
-
-    def report(
+        self.count += 1
+        if len(self._sample) < self.size:
+            self._sample.append((fraction, time))
+            self._update_slopes((fraction, time), 1, len(self._sample) - 1)
+        else:
+            index = random.randrange(self.count)
+            if index < self.size:
+                datum_leaving       = self._sample[index]
+                self._sample[index] = (fraction, time)
+                self._update_slopes(datum_leaving,    -1, index)
+                self._update_slopes((fraction, time),  1, index)
+        self._estimate = None
+
+    def _update_slopes(
         self,
-        style = None
+        datum,
+        sign,
+        index
         ):
-        if style is None:
-            style = self._default_report_style
-        if self._list_of_clocks != []:
-            if style == "statistics":
-                # Create a dictionary of clock types with corresponding lists of
-                # times for all instances.
-                dictionary_of_clock_types = {}
-                # Get the names of all clocks and add them to the dictionary.
-                for clock in self._list_of_clocks:
-                    dictionary_of_clock_types[clock.name()] = []
-                # Record the values of all clocks for their respective names in
-                # the dictionary.
-                for clock in self._list_of_clocks:
-                    dictionary_of_clock_types[clock.name()].append(clock.time())
-                # Create a report, calculating the average value for each clock
-                # type.
-                string = "clock type".ljust(39) + "mean time (s)"
-                for name, values in dictionary_of_clock_types.items():
-                    string += "\n" +\
-                        str(name).ljust(39) + str(sum(values)/len(values))
-                string += "\n"
-            elif style == "full":
-                # Create a report, listing the values of all clocks.
-                string = "clock".ljust(39) + "time (s)"
-                for clock in self._list_of_clocks:
-                    string += "\n" +\
-                        str(clock.name()).ljust(39) + str(clock.time())
-                string += "\n"
-        else:
-            string = "no clocks"
-        return string
-
-    def printout(
+        """
+        Insert (sign 1) or remove (sign -1) the slopes between a datum and the
+        data of the sample other than that at the specified index.
+        """
+        x_1, y_1 = datum
+        slopes   = self._slopes
+        for index_, (x_2, y_2) in enumerate(self._sample):
+            if index_ != index and x_2 != x_1:
+                slope = (y_2 - y_1) / (x_2 - x_1)
+                if sign > 0:
+                    bisect.insort(slopes, slope)
+                else:
+                    del slopes[bisect.bisect_left(slopes, slope)]
+
+    def _time_of_completion(
         self,
-        style = None
+        slope
         ):
-        if style is None:
-            style = self._default_report_style
-        print(self.report(style = style))
+        intercepts = sorted(y - slope * x for x, y in self._sample)
+        return _median_sorted(intercepts) + slope
+
+    def estimate(self):
+        if self._estimate is None:
+            slopes = self._slopes
+            if not slopes:
+                raise ValueError("Theil-Sen slope undefined")
+            n      = len(self._sample)
+            number = len(slopes)
+            C = self.deviations * math.sqrt(n * (n - 1) * (2 * n + 5) / 18)
+            index_lower = min(max(int((number - C) / 2), 0), number - 1)
+            index_upper = min(
+                max(int(math.ceil((number + C) / 2)), 0),
+                number - 1
+            )
+            self._estimate = (
+                self._time_of_completion(_median_sorted(slopes)),
+                self._time_of_completion(slopes[index_lower]),
+                self._time_of_completion(slopes[index_upper])
+            )
+        return self._estimate
+
+    def throughput(self):
+        if not self._slopes:
+            raise ValueError("Theil-Sen slope undefined")
+        return 1 / _median_sorted(self._slopes)
 
-class Progress():
+def _median_sorted(values):
+    middle = len(values) // 2
+    if len(values) % 2:
+        return values[middle]
+    return (values[middle - 1] + values[middle]) / 2
+
+class Progress(object):
+
+    """
+    This class estimates the time of completion of a process from data of the
+    fraction of the process complete over time. By default, it uses a running
+    linear model of time against fraction, so that adding data and estimating
+    take constant time and memory, fit to all data; it can be weighted
+    exponentially towards recent data using a decay factor, fit to a sliding
+    window of recent data or both. Another estimator, such as an EWMA_Rate_Estimator
+    or a Theil_Sen_Estimator, can be specified instead. The estimate is cached
+    until data are added to the model and, if a refresh interval is
+    specified, the status is rendered at most once per refresh interval.
+    """
 
     def __init__(
-        self
+        self,
+        decay            = None, # factor in (0, 1] for exponential weighting
+        window           = None, # number of recent data
+        refresh_interval = None, # s
+        estimator        = None  # default: Linear_Estimator(decay, window)
         ):
-        self.data              = []
         self.quick_calculation = False
         self.update_rate       = 1 # s
         self.clock             = Clock(name = "progress update clock")
+        self.refresh_interval  = refresh_interval
+        self._fraction         = None
+        self._estimate         = None # cached time of completion and bounds
+        self._status           = None # cached status
+        self._status_time      = None # monotonic time of cached status
+        # Times are modelled relative to the time of the first datum, for
+        # numerical precision.
+        self._time_start       = None
+        if estimator is None:
+            estimator = Linear_Estimator(decay = decay, window = window)
+        self._estimator        = estimator
 
     def engage_quick_calculation_mode(
         self
@@ -447,46 +2121,105 @@ class Progress():
         fraction = None,
         style    = None
         ):
-        if len(self.data) == 0:
-            self.data.append((fraction, time_UNIX()))
+        self._fraction = fraction
+        if self._estimator.count == 0:
+            self._time_start = time.time()
+            self._estimator.add(fraction, 0.0)
+            self._estimate = None
         elif self.quick_calculation is True:
             time_duration_since_last_update = self.clock.time()
             if time_duration_since_last_update >= self.update_rate:
-                self.data.append((fraction, time_UNIX()))
+                self._estimator.add(fraction, time.time() - self._time_start)
+                self._estimate = None
                 self.clock.reset()
                 self.clock.start()
         else:
-            self.data.append((fraction, time_UNIX()))
+            self._estimator.add(fraction, time.time() - self._time_start)
+            self._estimate = None
+        if self.refresh_interval is not None and style is None:
+            time_now = time.perf_counter()
+            if self._status is None or\
+                time_now - self._status_time >= self.refresh_interval:
+                self._status      = self.status()
+                self._status_time = time_now
+            return self._status
         return self.status(style = style)
 
+    def number_of_data(
+        self
+        ):
+        return self._estimator.count
+
+    def _estimates(
+        self
+        ):
+        """
+        Return the estimated time of completion and its lower and upper
+        confidence bounds as datetime objects, each None if it is undefined.
+        """
+        if self._estimate is None:
+            try:
+                times = self._estimator.estimate()
+            except (ArithmeticError, ValueError):
+                times = (None, None, None)
+            estimate = []
+            for time_ in times:
+                try:
+                    estimate.append(datetime.datetime.fromtimestamp(
+                        self._time_start + time_
+                    ))
+                except (TypeError, ArithmeticError, ValueError, OSError):
+                    estimate.append(None)
+            self._estimate = tuple(estimate)
+        return self._estimate
+
     def estimated_time_of_completion(
         self
         ):
-        if len(self.data) <= 1:
-            return 0
+        """
+        Return the estimated time of completion as a datetime object, or None
+        if the data do not define it (for example, if there are fewer than two
+        data or there has been no progress).
+        """
+        if self._estimator.count <= 1:
+            return None
         else:
-            try:
-                model_values = model_linear(
-                    self.data,
-                    quick_calculation = self.quick_calculation
-                )
-                b0 = model_values[0]
-                b1 = model_values[1]
-                x = 1
-                y = b0 + b1 * x
-            except:
-                y = 0
-            datetime_object = datetime.datetime.fromtimestamp(int(y))
-            return datetime_object
+            return self._estimates()[0]
+
+    def confidence_bounds(
+        self
+        ):
+        """
+        Return the lower and upper confidence bounds of the estimated time of
+        completion as datetime objects, each None if it is undefined.
+        """
+        if self._estimator.count <= 1:
+            return (None, None)
+        else:
+            return self._estimates()[1:]
+
+    def throughput(
+        self
+        ):
+        """
+        Return the estimated fraction of the process completed per second, or
+        None if the data do not define it.
+        """
+        try:
+            return self._estimator.throughput()
+        except (ArithmeticError, ValueError):
+            return None
 
     # estimated time of arrival
     def ETA(
         self
         ):
-        if len(self.data) <= 1:
+        if self._estimator.count <= 1:
             return style_datetime_object(
                 datetime_object = datetime.datetime.now()
             )
+        elif self.estimated_time_of_completion() is None:
+            return "unknown"
         else:
             return style_datetime_object(
                 datetime_object = self.estimated_time_of_completion()
@@ -496,8 +2229,10 @@ class Progress():
     def ETR(
         self
         ):
-        if len(self.data) <= 1:
+        if self._estimator.count <= 1:
             return 0
+        elif self.estimated_time_of_completion() is None:
+            return float("inf")
         else:
             delta_time = \
                 self.estimated_time_of_completion() - datetime.datetime.now()
@@ -509,7 +2244,7 @@ class Progress():
     def fraction(
         self
         ):
-        return self.data[-1][0]
+        return self._fraction
 
     def percentage(
         self
@@ -530,81 +2265,563 @@ class Progress():
                 ETR        = self.ETR()
             )
 
+class Progress_Reporter(object):
+
+    """
+    This class reports the progress of a loop of a known number of units of
+    work. The loop only increments a counter, using the method increment,
+    while a background thread periodically adds the fraction complete to a
+    progress estimator and writes its status to a file, by default the
+    standard error stream. The counter is intended to be incremented by one
+    thread. The total number of units of work is required and must be positive.
+    The throughput is in units of work per second.
+
+    with shijian.Progress_Reporter(total = len(events)) as reporter:
+        for event in events:
+            process(event)
+            reporter.increment()
+    """
+
+    def __init__(
+        self,
+        total            = None, # number of units of work
+        refresh_interval = 0.5,  # s
+        file             = None,
+        decay            = None, # factor in (0, 1] for exponential weighting
+        window           = None, # number of recent data
+        estimator        = None  # default: Linear_Estimator(decay, window)
+        ):
+        if total is None or total <= 0:
+            raise ValueError("total number of units of work not positive")
+        self.total             = total
+        self.completed         = 0
+        self._refresh_interval = refresh_interval
+        self._file             = file
+        self._progress         = Progress(
+            decay     = decay,
+            window    = window,
+            estimator = estimator
+        )
+        self._thread           = None
+        self._stop_event       = threading.Event()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(
+        self,
+        exception_type,
+        exception_value,
+        traceback
+        ):
+        self.stop()
+        return False
+
+    def increment(
+        self,
+        number = 1
+        ):
+        self.completed += number
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target = self._run,
+            name   = "shijian progress reporter"
+        )
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
+        self.refresh()
+        self._write("\n")
+
+    def refresh(self):
+        """
+        Add the fraction complete to the progress estimator and write its
+        status.
+        """
+        self._write(self._progress.add_datum(fraction = self.fraction()))
+
+    def fraction(self):
+        return self.completed / self.total
+
+    def throughput(self):
+        """
+        Return the number of units of work completed per second estimated by
+        the progress estimator from the data added at each refresh, or None if
+        the data do not define it.
+        """
+        throughput = self._progress.throughput()
+        if throughput is None:
+            return None
+        return throughput * self.total
+
+    def status(self):
+        return self._progress.status()
+
+    def _run(self):
+        while not self._stop_event.wait(self._refresh_interval):
+            self.refresh()
+
+    def _write(
+        self,
+        string
+        ):
+        file = self._file if self._file is not None else sys.stderr
+        file.write(string)
+        file.flush()
+
+class Shared_Progress(Progress_Reporter):
+
+    """
+    This class reports the progress of units of work split across processes,
+    such as the workers of a multiprocessing pool. Each process increments its
+    own counter in shared memory, without locking or interprocess
+    communication, and the process that created the object aggregates the
+    counters to compute the fraction complete, the throughput and the
+    estimated time of completion, as class Progress_Reporter does. A process
+    claims a counter on its first increment; if more processes increment than
+    there are counters, the further processes share a counter protected by a
+    lock. The counter of a process is not locked, so it is intended to be
+    incremented by one thread in each process: increments made concurrently
+    by several threads of a process can be lost, so such threads should
+    serialize their increments, for example with a lock of their own. The
+    object is passed to workers by inheritance, for example as an argument of
+    the pool initializer, and its shared memory is created with the
+    multiprocessing context of the workers.
+
+    def initialize(progress):
+        global shared_progress
+        shared_progress = progress
+
+    def work(event):
+        process(event)
+        shared_progress.increment()
+
+    progress = shijian.Shared_Progress(total = len(events))
+    with progress, multiprocessing.Pool(
+        initializer = initialize,
+        initargs    = (progress,)
+    ) as pool:
+        pool.map(work, events)
+    """
+
+    def __init__(
+        self,
+        total             = None, # number of units of work
+        number_of_workers = None, # default: number of processors
+        refresh_interval  = 0.5,  # s
+        file              = None,
+        decay             = None, # factor in (0, 1] for exponential weighting
+        window            = None, # number of recent data
+        estimator         = None, # default: Linear_Estimator(decay, window)
+        context           = None  # multiprocessing context of the workers
+        ):
+        if context is None:
+            import multiprocessing
+            context = multiprocessing.get_context()
+        if number_of_workers is None:
+            number_of_workers = context.cpu_count()
+        # The last counter is shared by processes that could not claim one.
+        self._counts        = context.RawArray("q", number_of_workers + 1)
+        self._slots_claimed = context.RawValue("i", 0)
+        self._lock          = context.Lock()
+        self._slot          = None
+        self._pid           = None
+        Progress_Reporter.__init__(
+            self,
+            total            = total,
+            refresh_interval = refresh_interval,
+            file             = file,
+            decay            = decay,
+            window           = window,
+            estimator        = estimator
+        )
+
+    def __getstate__(self):
+        return {
+            "total":             self.total,
+            "_counts":           self._counts,
+            "_slots_claimed":    self._slots_claimed,
+            "_lock":             self._lock,
+            "_refresh_interval": self._refresh_interval
+        }
+
+    def __setstate__(
+        self,
+        state
+        ):
+        self.__dict__.update(state)
+        self._slot       = None
+        self._pid        = None
+        self._file       = None
+        self._progress   = None
+        self._thread     = None
+        self._stop_event = None
+
+    @property
+    def completed(self):
+        return sum(self._counts)
+
+    @completed.setter
+    def completed(
+        self,
+        number
+        ):
+        with self._lock:
+            for index in range(len(self._counts)):
+                self._counts[index] = 0
+            self._counts[-1] = number
+
+    def increment(
+        self,
+        number = 1
+        ):
+        if self._pid != os.getpid():
+            self._claim_slot()
+        if self._slot == len(self._counts) - 1:
+            with self._lock:
+                self._counts[self._slot] += number
+        else:
+            self._counts[self._slot] += number
+
+    def _claim_slot(self):
+        with self._lock:
+            slot = self._slots_claimed.value
+            if slot < len(self._counts) - 1:
+                self._slots_claimed.value = slot + 1
+        self._slot = min(slot, len(self._counts) - 1)
+        self._pid  = os.getpid()
+
 def UID():
     return str(uuid.uuid4())
 
-def unique_number(
-    style = None
+def UIDs(
+    number = 1,
+    style  = "UUID4"
     ):
-    # mode: integer 3 significant figures
-    if style == "integer 3 significant figures":
-        initial_number = 100
-        if "unique_numbers_3_significant_figures" not in globals():
-            global unique_numbers_3_significant_figures
-            unique_numbers_3_significant_figures = []
-        if not unique_numbers_3_significant_figures:
-            unique_numbers_3_significant_figures.append(initial_number)
-        else:
-            unique_numbers_3_significant_figures.append(
-                unique_numbers_3_significant_figures[-1] + 1
+    """
+    This function returns a list of the specified number of unique
+    identifiers, formatted as UUIDs. The style "UUID4" returns random UUIDs of
+    version 4 of RFC 4122, like the function UID. The style "UUID7" returns
+    time-ordered UUIDs of version 7 of RFC 9562, which begin with the UNIX
+    time in milliseconds followed by a counter, so that identifiers returned
+    later in a process sort after those returned earlier, which improves the
+    locality of indices keyed by them. The random bits of the identifiers are
+    read from os.urandom in one block per call.
+    """
+    if style == "UUID4":
+        # Set the version and variant bits of each block of 16 bytes.
+        bytes_ = bytearray(os.urandom(16 * number))
+        bytes_[6::16] = bytes_[6::16].translate(_UUID4_version_table)
+        bytes_[8::16] = bytes_[8::16].translate(_UUID_variant_table)
+        hexadecimal = bytes_.hex()
+        return [
+            "-".join((
+                hexadecimal[index:index + 8],
+                hexadecimal[index + 8:index + 12],
+                hexadecimal[index + 12:index + 16],
+                hexadecimal[index + 16:index + 20],
+                hexadecimal[index + 20:index + 32]
+            )) for index in range(0, 32 * number, 32)
+        ]
+    elif style == "UUID7":
+        global _UUID7_time, _UUID7_counter
+        with _UUID7_lock:
+            time_ = time.time_ns() // 1000000
+            if time_ > _UUID7_time:
+                _UUID7_time    = time_
+                _UUID7_counter = random.getrandbits(41)
+            if _UUID7_counter + number > 1 << 42:
+                # The counter overflows, so the time is advanced.
+                _UUID7_time    += 1
+                _UUID7_counter = random.getrandbits(41)
+                if _UUID7_counter + number > 1 << 42:
+                    _UUID7_counter = 0
+            time_   = _UUID7_time
+            counter = _UUID7_counter
+            _UUID7_counter += number
+        # 48 bits of time, 4 bits of version, 12 bits of the counter, 2 bits of
+        # variant, 30 bits of the counter and 32 random bits
+        prefix      = (time_ << 80) | (7 << 76) | (2 << 62)
+        hexadecimal = os.urandom(4 * number).hex()
+        UIDs_       = []
+        for index in range(number):
+            value = "{0:032x}".format(
+                prefix |
+                ((counter + index) >> 30 << 64) |
+                (((counter + index) & 0x3fffffff) << 32)
             )
-        if\
-            style == "integer 3 significant figures" and \
-            unique_numbers_3_significant_figures[-1] > 999:
-            raise Exception
-        return unique_numbers_3_significant_figures[-1]
-    # mode: integer
+            UIDs_.append("-".join((
+                value[:8],
+                value[8:12],
+                value[12:16],
+                value[16:20],
+                value[20:24] + hexadecimal[8 * index:8 * index + 8]
+            )))
+        return UIDs_
     else:
-        initial_number = 1
-        if "unique_numbers" not in globals():
-            global unique_numbers
-            unique_numbers = []
-        if not unique_numbers:
-            unique_numbers.append(initial_number)
+        raise ValueError("unknown UID style {style}".format(style = style))
+
+_UUID4_version_table = bytes(byte & 0x0f | 0x40 for byte in range(256))
+_UUID_variant_table  = bytes(byte & 0x3f | 0x80 for byte in range(256))
+_UUID7_lock    = threading.Lock()
+_UUID7_time    = 0
+_UUID7_counter = 0
+
+class Unique_Number_Allocator(object):
+
+    """
+    This class allocates unique integers by counting up from an initial
+    number, optionally to a maximum, holding only the next number to allocate.
+    Allocation is atomic across threads, and a block of consecutive numbers
+    can be reserved in one call. An allocator can be shared across processes
+    either by a counter in shared memory (shared = True), passed to processes
+    by inheritance like other multiprocessing objects, or by a counter in a
+    file locked during each allocation (filename), which can be used by
+    unrelated processes on POSIX systems. If allocating would exceed the
+    maximum, OverflowError is raised and no numbers are allocated.
+    """
+
+    def __init__(
+        self,
+        initial_number = 1,
+        maximum        = None,
+        shared         = False,
+        filename       = None,
+        context        = None  # multiprocessing context of a shared counter
+        ):
+        self.initial_number = initial_number
+        self.maximum        = maximum
+        self._filename      = filename
+        self._value         = None
+        if shared:
+            if context is None:
+                import multiprocessing
+                context = multiprocessing.get_context()
+            self._value = context.RawValue("q", initial_number)
+            self._lock  = context.Lock()
         else:
-            unique_numbers.append(unique_numbers[-1] + 1)
-        return unique_numbers[-1]
+            self._next  = initial_number
+            self._lock  = threading.Lock()
+
+    def allocate(self):
+        """
+        Return the next unique number.
+        """
+        return self.reserve(number = 1)[0]
+
+    def reserve(
+        self,
+        number = 1
+        ):
+        """
+        Return a range of the specified number of consecutive unique numbers.
+        """
+        with self._lock:
+            if self._filename is not None:
+                start = self._reserve_file(number)
+            elif self._value is not None:
+                start = self._value.value
+                self._check(start, number)
+                self._value.value = start + number
+            else:
+                start = self._next
+                self._check(start, number)
+                self._next = start + number
+        return range(start, start + number)
+
+    def _check(
+        self,
+        start,
+        number
+        ):
+        if self.maximum is not None and start + number - 1 > self.maximum:
+            raise OverflowError("unique numbers exceed maximum {maximum}".format(
+                maximum = self.maximum
+            ))
+
+    def _reserve_file(
+        self,
+        number
+        ):
+        import fcntl
+        descriptor = os.open(self._filename, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(descriptor, fcntl.LOCK_EX)
+            content = os.read(descriptor, 64).strip()
+            start   = int(content) if content else self.initial_number
+            self._check(start, number)
+            content = str(start + number).encode()
+            os.lseek(descriptor, 0, os.SEEK_SET)
+            os.ftruncate(descriptor, 0)
+            os.write(descriptor, content)
+        finally:
+            os.close(descriptor)
+        return start
+
+def unique_number(
+    style = None
+    ):
+    """
+    This function returns an integer that it has not returned before in the
+    process. The style "integer 3 significant figures" counts up from 100 to
+    999, after which it raises OverflowError; all other styles share one
+    sequence counting up from 1.
+    """
+    if style in _unique_number_allocators:
+        return _unique_number_allocators[style].allocate()
+    return _unique_number_allocator.allocate()
+
+_unique_number_allocator  = Unique_Number_Allocator()
+_unique_number_allocators = {
+    "integer 3 significant figures": Unique_Number_Allocator(
+        initial_number = 100,
+        maximum        = 999
+    )
+}
 
 def unique_3_digit_number():
     return unique_number(style = "integer 3 significant figures")
 
 ## @brief make text filename or URL safe
+#  @detail This function removes characters other than letters, digits,
+#  underscores, hyphens and whitespace from text, after decomposing accented
+#  characters and dropping characters that are not ASCII, and then replaces runs
+#  of whitespace with underscores for filenames or replaces runs of whitespace
+#  and hyphens with hyphens in lowercase text for URLs. Text that is ASCII
+#  already skips the decomposition. Bytes are decoded as UTF-8. If neither a
+#  filename nor a URL is specified, text is returned unchanged.
+#  @return string
 def slugify(
     text       = None,
     filename   = True,
     URL        = False,
-    return_str = True
+    return_str = True  # retained for compatibility; text is returned as str
+    ):
+    text = _slugify_normalize(text, filename = filename, URL = URL)
+    if URL:
+        text = _slugify_pattern_unsafe.sub("", text).strip().lower()
+        text = _slugify_pattern_hyphens.sub("-", text)
+    elif filename:
+        text = _slugify_pattern_unsafe.sub("", text).strip()
+        text = _slugify_pattern_whitespace.sub("_", text)
+    return text
+
+def _slugify_normalize(
+    text,
+    filename = True,
+    URL      = False
     ):
-    if type(text) is not unicode:
-        text = unicode(text, "utf-8")
-    if filename and not URL:
-        text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore")
-        text = unicode(re.sub("[^\w\s-]", "", text).strip())
-        text = unicode(re.sub("[\s]+", "_", text))
-    elif URL:
-        text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore")
-        text = unicode(re.sub("[^\w\s-]", "", text).strip().lower())
-        text = unicode(re.sub("[-\s]+", "-", text))
-    if return_str:
-        text = str(text)
+    """
+    Decode bytes as UTF-8 and, for a filename or URL, decompose accented
+    characters and drop characters that are not ASCII, skipping text that is
+    ASCII already.
+    """
+    if isinstance(text, bytes):
+        text = text.decode("utf-8")
+    if (filename or URL) and not text.isascii():
+        text = unicodedata.normalize("NFKD", text).encode(
+            "ascii",
+            "ignore"
+        ).decode("ascii")
     return text
 
+_slugify_pattern_unsafe     = re.compile(r"[^\w\s-]", re.ASCII)
+_slugify_pattern_whitespace = re.compile(r"\s+",       re.ASCII)
+_slugify_pattern_hyphens    = re.compile(r"[-\s]+",    re.ASCII)
+
+## @brief make text filename or URL safe, caching recent results
+#  @detail This function is the function slugify with a least-recently-used
+#  cache of results, for text that recurs.
+#  @return string
+@functools.lru_cache(maxsize = 4096)
+def slugify_cached(
+    text     = None,
+    filename = True,
+    URL      = False
+    ):
+    return slugify(text = text, filename = filename, URL = URL)
+
+## @brief make a list of texts filename or URL safe
+#  @return list of strings
+def slugify_texts(
+    texts    = None,
+    filename = True,
+    URL      = False
+    ):
+    slugs = [
+        _slugify_normalize(text, filename = filename, URL = URL)
+        for text in texts
+    ]
+    if URL:
+        substitute_unsafe  = _slugify_pattern_unsafe.sub
+        substitute_hyphens = _slugify_pattern_hyphens.sub
+        return [
+            substitute_hyphens("-", substitute_unsafe("", text).strip().lower())
+            for text in slugs
+        ]
+    elif filename:
+        substitute_unsafe     = _slugify_pattern_unsafe.sub
+        substitute_whitespace = _slugify_pattern_whitespace.sub
+        return [
+            substitute_whitespace("_", substitute_unsafe("", text).strip())
+            for text in slugs
+        ]
+    return slugs
+
 ## @brief propose a filename
 #  @detail This function returns a filename string. If a default filename is not
 #  specified, the function generates one based on the current time. If a default
 #  filename is specified, the function uses it as the default filename. By
-#  default, the function then checks to see if using the filename would cause
+#  default, the name of the file, excluding its directory and extension, is
+#  slugified. By default, the function then checks to see if using the filename would cause
 #  overwriting of an existing file. If overwriting is possible, the function
-#  appends an integer to the filename in a loop in order to generate a filename
-#  that would not cause overwriting of an existing file. The function can be set
-#  to overwrite instead of using the default overwrite protection behaviour.
+#  appends an integer to the filename in order to generate a filename that would
+#  not cause overwriting of an existing file. The search for the integer can be
+#  "linear", testing integers from 1 in a loop, "listing", listing the directory
+#  once and choosing the lowest integer not used, which returns the same
+#  filename as a linear search using one directory listing instead of a test per
+#  integer, or "exponential", testing integers doubling from 1 and then
+#  bisecting, which uses a number of tests logarithmic in the number of existing
+#  files, assuming the integers used are consecutive from 1. The function can be
+#  set to overwrite instead of using the default overwrite protection behaviour.
 #  @return filename string
 def propose_filename(
     filename                       = None,
     overwrite                      = False,
     slugify_filename               = True,
-    exclude_extension_from_slugify = True
+    exclude_extension_from_slugify = True,
+    search                         = "linear"
+    ):
+    return _propose_filename(
+        filename                       = filename,
+        overwrite                      = overwrite,
+        slugify_filename               = slugify_filename,
+        exclude_extension_from_slugify = exclude_extension_from_slugify,
+        search                         = search
+    )[0]
+
+def _propose_filename(
+    filename                       = None,
+    overwrite                      = False,
+    slugify_filename               = True,
+    exclude_extension_from_slugify = True,
+    search                         = "linear"
     ):
+    """
+    Return the filename proposed, a function that returns the filename with an
+    appended integer and the integer appended to the filename proposed, or 0.
+    """
     # If no file name is specified, generate one.
     if not filename:
         filename = time_UTC()
@@ -614,29 +2831,119 @@ def propose_filename(
             filename_base = os.path.splitext(os.path.basename(filename))[0]
             filename_extension = os.path.splitext(os.path.basename(filename))[1]
             filename_base = slugify(text = filename_base)
-            filename_proposed = filename_base + filename_extension
+            filename_proposed = os.path.join(
+                os.path.dirname(filename),
+                filename_base + filename_extension
+            )
         else:
             filename_proposed = slugify(text = filename)
-    if not overwrite:
-        count = 0
-        while os.path.exists(filename_proposed):
-            count = count + 1
-            filename_directory = os.path.dirname(filename)
-            filename_base = os.path.splitext(os.path.basename(filename))[0]
-            filename_extension = os.path.splitext(os.path.basename(filename))[1]
-            if filename_directory:
-                filename_proposed = filename_directory + \
-                                    "/"                + \
-                                    filename_base      + \
-                                    "_"                + \
-                                    str(count)         + \
-                                    filename_extension
-            else:
-                filename_proposed = filename_base      + \
-                                    "_"                + \
-                                    str(count)         + \
-                                    filename_extension
-    return filename_proposed
+    filename_directory = os.path.dirname(filename)
+    filename_base, filename_extension = os.path.splitext(
+        os.path.basename(filename)
+    )
+    if filename_directory:
+        filename_prefix = filename_directory + "/" + filename_base + "_"
+    else:
+        filename_prefix = filename_base + "_"
+    def filename_numbered(count):
+        return filename_prefix + str(count) + filename_extension
+    count = 0
+    if not overwrite and os.path.exists(filename_proposed):
+        if search == "linear":
+            count = 1
+            while os.path.exists(filename_numbered(count)):
+                count = count + 1
+        elif search == "listing":
+            pattern = re.compile(
+                re.escape(filename_base) + "_([1-9][0-9]*)" +
+                re.escape(filename_extension)
+            )
+            counts = set()
+            for name in os.listdir(filename_directory or "."):
+                match = pattern.fullmatch(name)
+                if match:
+                    counts.add(int(match.group(1)))
+            count = 1
+            while count in counts:
+                count = count + 1
+        elif search == "exponential":
+            count_used = 0
+            count      = 1
+            while os.path.exists(filename_numbered(count)):
+                count_used = count
+                count      = count * 2
+            while count - count_used > 1:
+                count_middle = (count_used + count) // 2
+                if os.path.exists(filename_numbered(count_middle)):
+                    count_used = count_middle
+                else:
+                    count      = count_middle
+        else:
+            raise ValueError("unknown search {search}".format(search = search))
+        filename_proposed = filename_numbered(count)
+    return (filename_proposed, filename_numbered, count)
+
+## @brief reserve a filename
+#  @detail This function proposes a filename, as the function propose_filename
+#  does, and creates the file atomically, failing if it exists, so that
+#  processes reserving filenames concurrently never reserve the same filename.
+#  If the file proposed has been created since it was proposed, the function
+#  tries the filename with the next integer appended, and so on.
+#  @return file object open for writing, with the filename as attribute name
+def reserve_filename(
+    filename                       = None,
+    slugify_filename               = True,
+    exclude_extension_from_slugify = True,
+    search                         = "linear",
+    mode                           = "wb"
+    ):
+    return reserve_filenames(
+        number                         = 1,
+        filename                       = filename,
+        slugify_filename               = slugify_filename,
+        exclude_extension_from_slugify = exclude_extension_from_slugify,
+        search                         = search,
+        mode                           = mode
+    )[0]
+
+## @brief reserve a number of filenames
+#  @detail This function reserves the specified number of filenames, as the
+#  function reserve_filename does, searching for unused integers once for all of
+#  them, for example for the workers of a pool.
+#  @return list of file objects open for writing
+def reserve_filenames(
+    number                         = 1,
+    filename                       = None,
+    slugify_filename               = True,
+    exclude_extension_from_slugify = True,
+    search                         = "listing",
+    mode                           = "wb"
+    ):
+    filename_proposed, filename_numbered, count = _propose_filename(
+        filename                       = filename,
+        slugify_filename               = slugify_filename,
+        exclude_extension_from_slugify = exclude_extension_from_slugify,
+        search                         = search
+    )
+    files = []
+    while len(files) < number:
+        try:
+            files.append(open(
+                filename_proposed,
+                mode,
+                opener = _open_exclusive
+            ))
+        except FileExistsError:
+            pass
+        count = count + 1
+        filename_proposed = filename_numbered(count)
+    return files
+
+def _open_exclusive(
+    filename,
+    flags
+    ):
+    return os.open(filename, flags | os.O_CREAT | os.O_EXCL, 0o666)
 
 def ensure_platform_release(
     keyphrase  = "el7",
@@ -762,6 +3069,105 @@ def directory_listing(
             files_list.append(os.path.join(root, filename))
     return files_list
 
+## @brief generate the files at a specified directory and its subdirectories
+#  @detail This function generates the paths of the files at a directory and its
+#  subdirectories as it scans them, in the order of the function
+#  directory_listing, using os.scandir, so that the types of entries do not need
+#  to be tested separately in most filesystems. Optionally, it generates the
+#  os.DirEntry objects of the files instead, whose stat information is cached.
+#  Files can be filtered by glob patterns of names to include and names to
+#  exclude (which also exclude subdirectories) and the depth of subdirectories
+#  scanned can be limited, with a maximum depth of 0 scanning the directory
+#  only. With a number of threads, subdirectories are scanned concurrently in a
+#  pool of threads, for filesystems of high latency, and files are generated in
+#  the order in which their directories are scanned. Directories that cannot be
+#  scanned are skipped, as by the function os.walk.
+#  @return generator of paths or os.DirEntry objects
+def scan_directory(
+    directory         = ".",
+    include           = None, # glob pattern or list of glob patterns
+    exclude           = None, # glob pattern or list of glob patterns
+    maximum_depth     = None,
+    number_of_threads = None,
+    entries           = False,
+    follow_symlinks   = False
+    ):
+    include = _glob_pattern(include)
+    exclude = _glob_pattern(exclude)
+    def scan(directory):
+        files       = []
+        directories = []
+        try:
+            with os.scandir(directory) as iterator:
+                for entry in iterator:
+                    if exclude is not None and exclude.match(entry.name):
+                        continue
+                    try:
+                        is_directory = entry.is_dir()
+                    except OSError:
+                        is_directory = False
+                    if is_directory:
+                        if follow_symlinks or not entry.is_symlink():
+                            directories.append(entry.path)
+                    elif include is None or include.match(entry.name):
+                        files.append(entry if entries else entry.path)
+        except OSError:
+            pass
+        return (files, directories)
+    # Directories to scan are stacked with their depths, deepest last.
+    stack = [(directory, 0)]
+    if not number_of_threads or number_of_threads <= 1:
+        while stack:
+            directory, depth = stack.pop()
+            files, directories = scan(directory)
+            yield from files
+            if maximum_depth is None or depth < maximum_depth:
+                stack.extend(
+                    (directory_, depth + 1)
+                    for directory_ in reversed(directories)
+                )
+        return
+    import concurrent.futures
+    with concurrent.futures.ThreadPoolExecutor(number_of_threads) as executor:
+        futures = {}
+        try:
+            while stack or futures:
+                # The number of scans in progress is bounded, so that the
+                # results waiting to be generated are bounded.
+                while stack and len(futures) < 2 * number_of_threads:
+                    directory, depth = stack.pop()
+                    futures[executor.submit(scan, directory)] = depth
+                done, not_done = concurrent.futures.wait(
+                    futures,
+                    return_when = concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done:
+                    depth = futures.pop(future)
+                    files, directories = future.result()
+                    if maximum_depth is None or depth < maximum_depth:
+                        stack.extend(
+                            (directory_, depth + 1)
+                            for directory_ in reversed(directories)
+                        )
+                    yield from files
+        finally:
+            for future in futures:
+                future.cancel()
+
+def _glob_pattern(patterns):
+    """
+    Return a compiled regular expression that matches any of the specified glob
+    patterns, a pattern or a list of patterns, or None if none are specified.
+    """
+    import fnmatch
+    if patterns is None:
+        return None
+    if isinstance(patterns, str):
+        patterns = [patterns]
+    return re.compile("|".join(
+        "(?:" + fnmatch.translate(pattern) + ")" for pattern in patterns
+    ))
+
 def engage_command(
     command = None
     ):
@@ -1022,6 +3428,8 @@ def change_list_resolution(
     interpolation_type = "linear",
     dimensions         = 1
     ):
+    import numpy
+    import scipy.interpolate
     y1 = values
     x1 = range(0, len(values))
     interpolation = scipy.interpolate.interp1d(
@@ -1051,6 +3459,7 @@ def change_sound_file_waveform_to_sound_file_rectangle_waveform(
     overwrite                   = False,
     fraction_amplitude          = 0.01
     ):
+    import scipy.io.wavfile
     if filename_rectangle_waveform is None:
         filename_rectangle_waveform = filename_waveform
     filename_rectangle_waveform = propose_filename(
@@ -1094,8 +3503,31 @@ def composite_variable(x):
 
 def model_linear(
     data              = None,
-    quick_calculation = False
+    quick_calculation = False,
+    weights           = None,
+    residuals         = False
     ):
+    """
+    This function fits a linear model y = b0 + b1 * x by least squares to data
+    of (x, y) values, a list of tuples or an array of two columns, and returns
+    the model parameters (b0, b1), raising ZeroDivisionError if they are
+    undefined. Optionally, the data can be weighted and statistics of the
+    residuals can be returned as a third element, a dictionary of their sum
+    of squares, standard deviation, maximum absolute value and the
+    coefficient of determination. Small, unweighted lists of data are fit in
+    Python, while arrays, larger lists, weighted fits and fits with
+    statistics of residuals are fit using NumPy, without work per element in
+    Python and about the means of the data, for numerical precision.
+    """
+    if weights is not None or residuals is True or\
+        not isinstance(data, (list, tuple)) or\
+        len(data) > _model_linear_Python_maximum:
+        return _model_linear_NumPy(
+            data              = data,
+            quick_calculation = quick_calculation,
+            weights           = weights,
+            residuals         = residuals
+        )
     if quick_calculation is True:
         data = select_spread(data, 10)
     n = len(data)
@@ -1115,21 +3547,118 @@ def model_linear(
     b0 = (sum(y_values) - b1 * sum(x_values)) / n
     return (b0, b1)
 
+_model_linear_Python_maximum = 100 # number of data
+
+def _model_linear_NumPy(
+    data              = None,
+    quick_calculation = False,
+    weights           = None,
+    residuals         = False
+    ):
+    import numpy
+    data = numpy.asarray(data, dtype = numpy.float64).reshape(-1, 2)
+    if weights is not None:
+        weights = numpy.asarray(weights, dtype = numpy.float64)
+    if quick_calculation is True:
+        indices = select_spread(list(range(len(data))), 10)
+        data    = data[indices]
+        if weights is not None:
+            weights = weights[indices]
+    x = data[:, 0]
+    y = data[:, 1]
+    if weights is None:
+        n      = float(len(x))
+        x_mean = float(x.sum()) / n
+        y_mean = float(y.sum()) / n
+        x_deviations = x - x_mean
+        y_deviations = y - y_mean
+        S_xx = float(numpy.dot(x_deviations, x_deviations))
+        S_xy = float(numpy.dot(x_deviations, y_deviations))
+    else:
+        n      = float(weights.sum())
+        x_mean = float(numpy.dot(weights, x)) / n
+        y_mean = float(numpy.dot(weights, y)) / n
+        x_deviations = x - x_mean
+        y_deviations = y - y_mean
+        S_xx = float(numpy.dot(weights * x_deviations, x_deviations))
+        S_xy = float(numpy.dot(weights * x_deviations, y_deviations))
+    b1 = S_xy / S_xx
+    b0 = y_mean - b1 * x_mean
+    if residuals is False:
+        return (b0, b1)
+    residuals_ = y_deviations - b1 * x_deviations
+    if weights is None:
+        sum_of_squares       = float(numpy.dot(residuals_, residuals_))
+        sum_of_squares_total = float(numpy.dot(y_deviations, y_deviations))
+    else:
+        sum_of_squares       = float(numpy.dot(weights * residuals_, residuals_))
+        sum_of_squares_total = float(
+            numpy.dot(weights * y_deviations, y_deviations)
+        )
+    degrees_of_freedom = len(x) - 2
+    statistics = {
+        "sum_of_squares":               sum_of_squares,
+        "standard_deviation":           math.sqrt(
+            sum_of_squares / degrees_of_freedom
+        ) if degrees_of_freedom > 0 else float("nan"),
+        "maximum":                      float(numpy.abs(residuals_).max()),
+        "coefficient_of_determination": 1 - sum_of_squares /\
+            sum_of_squares_total if sum_of_squares_total else 1.0
+    }
+    return (b0, b1, statistics)
+
 def import_object(
     filename  = None
     ):
     return pickle.load(open(filename, "rb"))
 
+## @brief export an object to a file
+#  @detail This function pickles an object to a temporary file in the directory
+#  of the filename and then renames it to the filename, so that the file never
+#  has partial content. Unless overwriting is specified, the filename is
+#  reserved first, as by the function reserve_filename, so that concurrent
+#  exports never write to the same filename.
+#  @return filename string
 def export_object(
     x,
     filename  = None,
     overwrite = False
     ):
-    filename = propose_filename(
-        filename  = filename,
-        overwrite = overwrite
-    )
-    pickle.dump(x, open(filename, "wb"))
+    if overwrite:
+        filename = propose_filename(
+            filename  = filename,
+            overwrite = overwrite
+        )
+    else:
+        with reserve_filename(filename = filename) as file_reserved:
+            filename = file_reserved.name
+    # The temporary file is created as a file is normally, so that its mode
+    # follows the umask.
+    while True:
+        filename_temporary = os.path.join(
+            os.path.dirname(filename),
+            "." + os.path.basename(filename) + "." + os.urandom(6).hex() +
+            ".tmp"
+        )
+        try:
+            descriptor = os.open(
+                filename_temporary,
+                os.O_WRONLY | os.O_CREAT | os.O_EXCL,
+                0o666
+            )
+            break
+        except FileExistsError:
+            continue
+    try:
+        with os.fdopen(descriptor, "wb") as file_temporary:
+            pickle.dump(x, file_temporary)
+        os.replace(filename_temporary, filename)
+    except BaseException:
+        os.remove(filename_temporary)
+        if not overwrite:
+            os.remove(filename)
+        raise
+    return filename
 
 def string_to_bool(x):
     return x.lower() in ("yes", "true", "t", "1")
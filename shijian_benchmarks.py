@@ -0,0 +1,1007 @@
+#!/usr/bin/env python
+
+"""
+################################################################################
+#                                                                              #
+# shijian_benchmarks                                                           #
+#                                                                              #
+################################################################################
+#                                                                              #
+# LICENCE INFORMATION                                                          #
+#                                                                              #
+# This program is shijian benchmarks.                                          #
+#                                                                              #
+# copyright (C) 2017 Will Breaden Madden, wbm@protonmail.ch                    #
+#                                                                              #
+# This software is released under the terms of the GNU General Public License  #
+# version 3 (GPLv3).                                                           #
+#                                                                              #
+# This program is free software: you can redistribute it and/or modify it      #
+# under the terms of the GNU General Public License as published by the Free   #
+# Software Foundation, either version 3 of the License, or (at your option)    #
+# any later version.                                                           #
+#                                                                              #
+# This program is distributed in the hope that it will be useful, but WITHOUT  #
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or        #
+# FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for     #
+# more details.                                                                #
+#                                                                              #
+# For a copy of the GNU General Public License, see                            #
+# <http://www.gnu.org/licenses/>.                                              #
+#                                                                              #
+################################################################################
+"""
+
+from __future__ import division
+
+name    = "shijian_benchmarks"
+version = "2017-03-15T1633Z"
+
+import asyncio
+import datetime
+import os
+import functools
+import inspect
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import timeit
+
+import shijian
+
+def main():
+
+    benchmark_import()
+    benchmark_style_datetime_object()
+    benchmark_style_UNIX_timestamps()
+    benchmark_style_timedeltas()
+    benchmark_coarse_clock()
+    benchmark_daily_schedule()
+    benchmark_clock()
+    benchmark_timer()
+    benchmark_concurrency()
+    benchmark_span()
+    benchmark_export()
+    benchmark_progress()
+    benchmark_progress_reporter()
+    benchmark_shared_progress()
+    benchmark_progress_estimators()
+    benchmark_model_linear()
+    benchmark_UID()
+    benchmark_unique_number()
+    benchmark_slugify()
+    benchmark_propose_filename()
+    benchmark_reserve_filename()
+    benchmark_scan_directory()
+
+def report(
+    description = None,
+    seconds     = None,
+    number      = 1
+    ):
+    print("{description}".format(description = description).ljust(59) +\
+        "{time:.3e} s".format(time = seconds / number))
+
+def benchmark_import(
+    budget        = 0.1, # s
+    repeat        = 5,
+    heavy_modules = ["numpy", "scipy", "dateutil"]
+    ):
+    """
+    Time a bare `import shijian` in fresh interpreters, taking the best of
+    several runs, and fail if it exceeds the budget or if any heavy scientific
+    dependency is loaded as a side effect of the import.
+    """
+    command = [
+        sys.executable,
+        "-c",
+        "import sys, time; time_start = time.time(); import shijian; " +\
+        "print(time.time() - time_start); " +\
+        "print(\",\".join(sorted(m for m in {modules} if m in sys.modules)))"\
+        .format(modules = repr(heavy_modules))
+    ]
+    # Import the shijian benchmarked, rather than whichever is on the path of
+    # the working directory.
+    directory   = os.path.dirname(os.path.abspath(shijian.__file__))
+    environment = os.environ.copy()
+    environment["PYTHONPATH"] = os.pathsep.join(
+        [directory] + ([environment["PYTHONPATH"]]
+        if environment.get("PYTHONPATH") else [])
+    )
+    times = []
+    for run in range(repeat):
+        output = subprocess.check_output(
+            command,
+            cwd = directory,
+            env = environment
+        ).decode("utf-8").split("\n")
+        times.append(float(output[0]))
+        modules_loaded = output[1].strip()
+        if modules_loaded:
+            raise Exception(
+                "import shijian loaded heavy modules: {modules}".format(
+                    modules = modules_loaded
+                )
+            )
+    report(description = "import shijian (best of {repeat})".format(
+        repeat = repeat
+    ), seconds = min(times))
+    if min(times) > budget:
+        raise Exception(
+            "import shijian took {time:.3f} s; budget {budget:.3f} s".format(
+                time   = min(times),
+                budget = budget
+            )
+        )
+
+def benchmark_style_datetime_object(
+    number = 100000
+    ):
+    """
+    Compare registry dispatch of function style_datetime_object with the
+    if/elif chain it replaced, for every registered style.
+    """
+    datetime_object = datetime.datetime.utcnow()
+    for style in sorted(shijian._datetime_styles):
+        for description, function in [
+            ("chain",    style_datetime_object_chain),
+            ("registry", shijian.style_datetime_object)
+        ]:
+            seconds = timeit.timeit(
+                lambda: function(datetime_object = datetime_object, style = style),
+                number = number
+            )
+            report(
+                description = "{description} {style}".format(
+                    description = description,
+                    style       = style
+                ),
+                seconds     = seconds,
+                number      = number
+            )
+
+def benchmark_style_UNIX_timestamps(
+    number_of_timestamps = 100000
+    ):
+    """
+    Compare styling a sequence of UNIX timestamps one at a time with styling
+    them in a batch, for every registered style, checking that the results are
+    identical.
+    """
+    timestamps = [
+        random.uniform(0, 4e9) for index in range(number_of_timestamps)
+    ]
+    for style in sorted(shijian._datetime_styles):
+        time_start = timeit.default_timer()
+        values_scalar = [
+            shijian.style_UNIX_timestamp(timestamp = timestamp, style = style)
+            for timestamp in timestamps
+        ]
+        seconds_scalar = timeit.default_timer() - time_start
+        time_start = timeit.default_timer()
+        values_batch = shijian.style_UNIX_timestamps(
+            timestamps = timestamps,
+            style      = style
+        )
+        seconds_batch = timeit.default_timer() - time_start
+        if values_scalar != values_batch:
+            raise Exception("batch results differ for style {style}".format(
+                style = style
+            ))
+        for description, seconds in [
+            ("scalar", seconds_scalar),
+            ("batch",  seconds_batch)
+        ]:
+            report(
+                description = "{description} {style}".format(
+                    description = description,
+                    style       = style
+                ),
+                seconds     = seconds,
+                number      = number_of_timestamps
+            )
+
+def benchmark_style_timedeltas(
+    number_of_timedeltas = 100000,
+    style                = "{DD} days, {HH}:{MM}:{SS}.{fff}"
+    ):
+    """
+    Compare styling a sequence of timedelta objects one at a time with styling
+    them in a batch, checking that the results are identical.
+    """
+    timedeltas = [
+        datetime.timedelta(seconds = random.uniform(0, 1e7))
+        for index in range(number_of_timedeltas)
+    ]
+    time_start = timeit.default_timer()
+    values_scalar = [
+        shijian.style_datetime_object(datetime_object = timedelta, style = style)
+        for timedelta in timedeltas
+    ]
+    seconds_scalar = timeit.default_timer() - time_start
+    time_start = timeit.default_timer()
+    values_batch = shijian.style_timedeltas(
+        timedeltas = timedeltas,
+        style      = style
+    )
+    seconds_batch = timeit.default_timer() - time_start
+    if values_scalar != values_batch:
+        raise Exception("batch results differ for style {style}".format(
+            style = style
+        ))
+    report(
+        description = "scalar timedelta {style}".format(style = style),
+        seconds     = seconds_scalar,
+        number      = number_of_timedeltas
+    )
+    report(
+        description = "batch timedelta {style}".format(style = style),
+        seconds     = seconds_batch,
+        number      = number_of_timedeltas
+    )
+
+def benchmark_coarse_clock(
+    number = 100000
+    ):
+    """
+    Compare the rates of calls of functions time_UTC and time_UNIX with the
+    rates of calls of their coarse clock equivalents.
+    """
+    coarse_clock = shijian.Coarse_Clock(resolution = 1)
+    for description, function in [
+        ("time_UTC",              shijian.time_UTC),
+        ("coarse clock time_UTC", coarse_clock.time_UTC),
+        ("time_UNIX",             shijian.time_UNIX),
+        ("coarse clock time_UNIX", coarse_clock.time_UNIX)
+    ]:
+        seconds = timeit.timeit(function, number = number)
+        print("{description}".format(description = description).ljust(59) +\
+            "{rate:.3e} calls/s".format(rate = number / seconds))
+
+def benchmark_daily_schedule(
+    number     = 100000,
+    time_range = "1700--0900"
+    ):
+    """
+    Compare checking a daily time range using function in_daily_time_range with
+    checking it using a daily schedule.
+    """
+    schedule = shijian.Daily_Schedule([time_range])
+    for description, function in [
+        ("in_daily_time_range",   lambda: shijian.in_daily_time_range(
+                                      time_range = time_range
+                                  )),
+        ("daily schedule active", schedule.active)
+    ]:
+        report(
+            description = description,
+            seconds     = timeit.timeit(function, number = number),
+            number      = number
+        )
+
+def benchmark_clock(
+    number = 100000
+    ):
+    """
+    Measure the overhead of a start and stop of a clock, in monotonic and
+    system modes, and of the creation of a clock.
+    """
+    for monotonic in [True, False]:
+        clock = shijian.Clock(start = False, monotonic = monotonic)
+        def start_stop():
+            clock.start()
+            clock.stop()
+        report(
+            description = "clock start and stop (monotonic: {monotonic})".format(
+                monotonic = monotonic
+            ),
+            seconds     = timeit.timeit(start_stop, number = number),
+            number      = number
+        )
+    report(
+        description = "clock creation",
+        seconds     = timeit.timeit(
+            lambda: shijian.Clock(name = "benchmark"),
+            number = number
+        ),
+        number      = number
+    )
+
+def benchmark_timer(
+    number = 100000
+    ):
+    """
+    Measure the overhead per call of a function decorated by the timer
+    decorator, in list mode, in aggregate mode and with timing disengaged, and
+    of the previous timer decorator, which created a clock for each call. A
+    registry is created for the measurements and the global registry is then
+    restored.
+    """
+    def function(x):
+        return x
+    function_timer          = shijian.timer(function)
+    function_timer_previous = timer_previous(function)
+    seconds_undecorated = timeit.timeit(lambda: function(1), number = number)
+    clocks = shijian.clocks
+    for description, function_decorated in [
+        ("timer (list mode)",         function_timer),
+        ("timer (aggregate mode)",    function_timer),
+        ("timer (timing disengaged)", function_timer),
+        ("previous timer",            function_timer_previous)
+    ]:
+        shijian.clocks = shijian.Clocks()
+        if "aggregate" in description:
+            shijian.clocks.engage_aggregate_mode()
+        if "disengaged" in description:
+            shijian.disengage_timing()
+        seconds = timeit.timeit(lambda: function_decorated(1), number = number)
+        shijian.engage_timing()
+        report(
+            description = "overhead per call of {description}".format(
+                description = description
+            ),
+            seconds     = seconds - seconds_undecorated,
+            number      = number
+        )
+    shijian.clocks = clocks
+
+def timer_previous(function):
+    """
+    This is the timer decorator previously used, retained for comparison.
+    """
+    @functools.wraps(function)
+    def decoration(
+        *args,
+        **kwargs
+        ):
+        arguments = inspect.getcallargs(function, *args, **kwargs)
+        clock     = shijian.Clock(name = function.__name__)
+        result    = function(*args, **kwargs)
+        clock.stop()
+        return result
+    return decoration
+
+def benchmark_concurrency(
+    number_of_threads = 16,
+    number_of_calls   = 10000,
+    number_of_tasks   = 1000
+    ):
+    """
+    Stress the timer decorator and a registry in aggregate mode using many
+    threads and asyncio tasks concurrently and check that every call and every
+    clock is recorded.
+    """
+    clocks = shijian.clocks
+    clocks.engage_aggregate_mode()
+    @shijian.timer
+    def function_threads():
+        clock = shijian.Clock(name = "benchmark concurrency clock")
+        clock.stop()
+    @shijian.timer
+    async def function_tasks():
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+    def worker():
+        for call in range(number_of_calls):
+            function_threads()
+    async def tasks():
+        await asyncio.gather(*[
+            function_tasks() for task in range(number_of_tasks)
+        ])
+    time_start = timeit.default_timer()
+    threads = [
+        threading.Thread(target = worker) for thread in range(number_of_threads)
+    ]
+    for thread in threads:
+        thread.start()
+    asyncio.run(tasks())
+    for thread in threads:
+        thread.join()
+    seconds = timeit.default_timer() - time_start
+    statistics = clocks.statistics()
+    for name, count_expected in [
+        ("function_threads",            number_of_threads * number_of_calls),
+        ("benchmark concurrency clock", number_of_threads * number_of_calls),
+        ("function_tasks",              number_of_tasks)
+    ]:
+        if statistics[name].count != count_expected:
+            raise Exception("{name}: {count} of {count_expected} recorded".format(
+                name           = name,
+                count          = statistics[name].count,
+                count_expected = count_expected
+            ))
+    report(
+        description = "concurrent timed calls ({number} threads)".format(
+            number = number_of_threads
+        ),
+        seconds     = seconds,
+        number      = number_of_threads * number_of_calls + number_of_tasks
+    )
+    clocks.disengage_aggregate_mode()
+
+def benchmark_span(
+    number = 100000
+    ):
+    """
+    Measure the overhead of entering and exiting a span, at the root of a call
+    tree and nested in another span.
+    """
+    def span_root():
+        with shijian.Span("benchmark span"):
+            pass
+    report(
+        description = "span",
+        seconds     = timeit.timeit(span_root, number = number),
+        number      = number
+    )
+    with shijian.Span("benchmark span parent"):
+        report(
+            description = "nested span",
+            seconds     = timeit.timeit(span_root, number = number),
+            number      = number
+        )
+
+def benchmark_export(
+    number_of_clocks = 100000
+    ):
+    """
+    Measure the time per record of exporting a registry of clocks to a file in
+    each format.
+    """
+    clocks = shijian.Clocks()
+    for index in range(number_of_clocks):
+        clock = shijian.Clock(name = "clock {index}".format(index = index % 10))
+        clock.stop()
+        clocks.add(clock)
+    for file_format, style in [
+        ("JSON lines",   "full"),
+        ("CSV",          "full"),
+        ("Chrome trace", None)
+    ]:
+        file_descriptor, filename = tempfile.mkstemp()
+        os.close(file_descriptor)
+        time_start = timeit.default_timer()
+        clocks.export(file = filename, file_format = file_format, style = style)
+        seconds = timeit.default_timer() - time_start
+        os.remove(filename)
+        report(
+            description = "export {file_format}".format(
+                file_format = file_format
+            ),
+            seconds     = seconds,
+            number      = number_of_clocks
+        )
+
+def benchmark_progress(
+    numbers_of_data = [1000, 10000, 100000]
+    ):
+    """
+    Measure the time per datum of adding data to a progress estimator and
+    getting its status, for increasing numbers of data, which should not grow
+    with the number of data.
+    """
+    for number_of_data in numbers_of_data:
+        progress = shijian.Progress()
+        time_start = timeit.default_timer()
+        for index in range(number_of_data):
+            progress.add_datum(fraction = (index + 1) / number_of_data)
+        report(
+            description = "progress datum and status ({number} data)".format(
+                number = number_of_data
+            ),
+            seconds     = timeit.default_timer() - time_start,
+            number      = number_of_data
+        )
+
+def benchmark_progress_reporter(
+    number = 1000000
+    ):
+    """
+    Measure the time per unit of work of reporting progress by incrementing
+    the counter of a progress reporter, compared to adding a datum to a
+    progress estimator and getting its status, without and with a refresh
+    interval.
+    """
+    with open(os.devnull, "w") as file_null:
+        with shijian.Progress_Reporter(
+            total = number,
+            file  = file_null
+        ) as reporter:
+            time_start = timeit.default_timer()
+            for index in range(number):
+                reporter.increment()
+            report(
+                description = "progress reporter increment",
+                seconds     = timeit.default_timer() - time_start,
+                number      = number
+            )
+    for refresh_interval in [None, 0.1]:
+        progress = shijian.Progress(refresh_interval = refresh_interval)
+        time_start = timeit.default_timer()
+        for index in range(number):
+            progress.add_datum(fraction = (index + 1) / number)
+        report(
+            description = "progress datum and status (refresh interval "\
+                          "{refresh_interval})".format(
+                refresh_interval = refresh_interval
+            ),
+            seconds     = timeit.default_timer() - time_start,
+            number      = number
+        )
+
+def benchmark_shared_progress(
+    number = 1000000
+    ):
+    """
+    Measure the time per unit of work of reporting progress by incrementing
+    the counter of a shared progress object, compared to incrementing a
+    lock-protected multiprocessing value.
+    """
+    import multiprocessing
+    value = multiprocessing.Value("q", 0)
+    time_start = timeit.default_timer()
+    for index in range(number):
+        with value.get_lock():
+            value.value += 1
+    report(
+        description = "locked multiprocessing value increment",
+        seconds     = timeit.default_timer() - time_start,
+        number      = number
+    )
+    progress = shijian.Shared_Progress(total = number)
+    time_start = timeit.default_timer()
+    for index in range(number):
+        progress.increment()
+    report(
+        description = "shared progress increment",
+        seconds     = timeit.default_timer() - time_start,
+        number      = number
+    )
+
+def benchmark_model_linear(
+    number = 1000000
+    ):
+    """
+    Measure the time per datum of fitting a linear model to a large number of
+    data, using the fit in Python previously used and the fit using NumPy, for
+    a list of tuples and for an array, unweighted, weighted and with
+    statistics of residuals.
+    """
+    import numpy
+    random.seed(0)
+    data       = [(x, 3 + 2 * x + random.gauss(0, 1)) for x in range(number)]
+    data_array = numpy.array(data)
+    weights    = numpy.ones(number)
+    for description, function in [
+        ("linear model previous (list)",
+            lambda: model_linear_previous(data = data)),
+        ("linear model (list)",
+            lambda: shijian.model_linear(data = data)),
+        ("linear model (array)",
+            lambda: shijian.model_linear(data = data_array)),
+        ("linear model (array, weighted)",
+            lambda: shijian.model_linear(data = data_array, weights = weights)),
+        ("linear model (array, residuals)",
+            lambda: shijian.model_linear(data = data_array, residuals = True))
+    ]:
+        time_start = timeit.default_timer()
+        function()
+        report(
+            description = description,
+            seconds     = timeit.default_timer() - time_start,
+            number      = number
+        )
+
+def benchmark_UID(
+    number = 100000
+    ):
+    """
+    Measure the time per identifier of generating UIDs one at a time and in
+    bulk, random and time-ordered.
+    """
+    time_start = timeit.default_timer()
+    for index in range(number):
+        shijian.UID()
+    report(
+        description = "UID",
+        seconds     = timeit.default_timer() - time_start,
+        number      = number
+    )
+    for style in ["UUID4", "UUID7"]:
+        time_start = timeit.default_timer()
+        shijian.UIDs(number = number, style = style)
+        report(
+            description = "UIDs ({style})".format(style = style),
+            seconds     = timeit.default_timer() - time_start,
+            number      = number
+        )
+
+def benchmark_unique_number(
+    number = 100000
+    ):
+    """
+    Measure the time per number of allocating unique numbers one at a time and
+    in blocks, in a process, in shared memory and in a locked file.
+    """
+    filename = os.path.join(tempfile.mkdtemp(), "numbers.txt")
+    for description, allocator in [
+        ("process",       shijian.Unique_Number_Allocator()),
+        ("shared memory", shijian.Unique_Number_Allocator(shared = True)),
+        ("file",          shijian.Unique_Number_Allocator(filename = filename))
+    ]:
+        number_current = number if description != "file" else number // 100
+        time_start = timeit.default_timer()
+        for index in range(number_current):
+            allocator.allocate()
+        report(
+            description = "unique number ({description})".format(
+                description = description
+            ),
+            seconds     = timeit.default_timer() - time_start,
+            number      = number_current
+        )
+        time_start = timeit.default_timer()
+        for index in range(number // 1000):
+            allocator.reserve(number = 1000)
+        report(
+            description = "unique number block of 1000 ({description})".format(
+                description = description
+            ),
+            seconds     = timeit.default_timer() - time_start,
+            number      = number
+        )
+    os.remove(filename)
+    os.rmdir(os.path.dirname(filename))
+
+def benchmark_slugify(
+    number = 100000
+    ):
+    """
+    Measure the time per text of slugifying ASCII and accented titles, one at
+    a time, with the cache for titles that recur and in a batch.
+    """
+    random.seed(0)
+    titles_ASCII = [
+        "Measurement of the Higgs boson mass, run {index}".format(index = index)
+        for index in range(number)
+    ]
+    titles_accented = [
+        "Mesure de la masse du boson de Higgs, série {index}".format(
+            index = index
+        ) for index in range(number)
+    ]
+    titles_recurrent = [
+        random.choice(titles_ASCII[:100]) for index in range(number)
+    ]
+    for description, function, titles in [
+        ("slugify (ASCII)",
+            shijian.slugify,         titles_ASCII),
+        ("slugify (accented)",
+            shijian.slugify,         titles_accented),
+        ("slugify (recurrent)",
+            shijian.slugify,         titles_recurrent),
+        ("slugify cached (recurrent)",
+            shijian.slugify_cached,  titles_recurrent)
+    ]:
+        time_start = timeit.default_timer()
+        for title in titles:
+            function(text = title)
+        report(
+            description = description,
+            seconds     = timeit.default_timer() - time_start,
+            number      = number
+        )
+    for description, titles in [
+        ("slugify texts (ASCII)",    titles_ASCII),
+        ("slugify texts (accented)", titles_accented)
+    ]:
+        time_start = timeit.default_timer()
+        shijian.slugify_texts(texts = titles)
+        report(
+            description = description,
+            seconds     = timeit.default_timer() - time_start,
+            number      = number
+        )
+
+def benchmark_propose_filename(
+    number = 100000
+    ):
+    """
+    Measure the time of proposing a filename in a directory of the specified
+    number of numbered files that collide with it, using linear, listing and
+    exponential searches.
+    """
+    directory = tempfile.mkdtemp()
+    filenames = [os.path.join(directory, "data.pkl")] + [
+        os.path.join(directory, "data_{index}.pkl".format(index = index))
+        for index in range(1, number + 1)
+    ]
+    for filename in filenames:
+        open(filename, "w").close()
+    for search in ["linear", "listing", "exponential"]:
+        time_start = timeit.default_timer()
+        shijian.propose_filename(
+            filename         = filenames[0],
+            slugify_filename = False,
+            search           = search
+        )
+        report(
+            description = "propose filename ({number} collisions, {search})"\
+                          .format(
+                number = number,
+                search = search
+            ),
+            seconds     = timeit.default_timer() - time_start,
+            number      = 1
+        )
+    for filename in filenames:
+        os.remove(filename)
+    os.rmdir(directory)
+
+def benchmark_reserve_filename(
+    number              = 1000,
+    number_of_processes = 8
+    ):
+    """
+    Measure the time per filename of reserving filenames one at a time, in a
+    batch and concurrently in a number of processes, checking that the
+    filenames reserved concurrently are unique.
+    """
+    import multiprocessing
+    directory = tempfile.mkdtemp()
+    for description, function in [
+        ("reserve filename", lambda: [
+            shijian.reserve_filename(
+                filename = os.path.join(directory, "single.pkl")
+            ).close() for index in range(number)
+        ]),
+        ("reserve filenames", lambda: [
+            file_.close() for file_ in shijian.reserve_filenames(
+                number   = number,
+                filename = os.path.join(directory, "batch.pkl")
+            )
+        ])
+    ]:
+        time_start = timeit.default_timer()
+        function()
+        report(
+            description = description,
+            seconds     = timeit.default_timer() - time_start,
+            number      = number
+        )
+    time_start = timeit.default_timer()
+    with multiprocessing.Pool(number_of_processes) as pool:
+        filenames = sum(pool.map(
+            reserve_filenames_worker,
+            [os.path.join(directory, "concurrent.pkl")] * number_of_processes
+        ), [])
+    report(
+        description = "reserve filename ({number} processes)".format(
+            number = number_of_processes
+        ),
+        seconds     = timeit.default_timer() - time_start,
+        number      = len(filenames)
+    )
+    if len(set(filenames)) != len(filenames):
+        raise Exception("filenames reserved concurrently are not unique")
+    for filename in os.listdir(directory):
+        os.remove(os.path.join(directory, filename))
+    os.rmdir(directory)
+
+def benchmark_scan_directory(
+    number_of_directories = 200,
+    number_of_files       = 100
+    ):
+    """
+    Measure the time per file of listing the files of a tree of directories
+    and the time to the first file, using the function directory_listing and
+    the function scan_directory, in a thread and in a pool of threads.
+    """
+    import shutil
+    directory = tempfile.mkdtemp()
+    for index_directory in range(number_of_directories):
+        subdirectory = os.path.join(
+            directory,
+            "{index}".format(index = index_directory % 10),
+            "{index}".format(index = index_directory)
+        )
+        os.makedirs(subdirectory)
+        for index_file in range(number_of_files):
+            open(os.path.join(subdirectory, "{index}.txt".format(
+                index = index_file
+            )), "w").close()
+    number = number_of_directories * number_of_files
+    for description, function in [
+        ("directory listing",
+            lambda: iter(shijian.directory_listing(directory = directory))),
+        ("scan directory",
+            lambda: shijian.scan_directory(directory = directory)),
+        ("scan directory (4 threads)",
+            lambda: shijian.scan_directory(
+                directory         = directory,
+                number_of_threads = 4
+            ))
+    ]:
+        time_start = timeit.default_timer()
+        files = function()
+        next(files)
+        report(
+            description = description + " first file",
+            seconds     = timeit.default_timer() - time_start,
+            number      = 1
+        )
+        for file_ in files:
+            pass
+        report(
+            description = description,
+            seconds     = timeit.default_timer() - time_start,
+            number      = number
+        )
+    shutil.rmtree(directory)
+
+def reserve_filenames_worker(
+    filename = None,
+    number   = 100
+    ):
+    filenames = []
+    for index in range(number):
+        with shijian.reserve_filename(filename = filename) as file_:
+            filenames.append(file_.name)
+    return filenames
+
+def model_linear_previous(
+    data              = None,
+    quick_calculation = False
+    ):
+    """
+    This is the function model_linear previously used, retained for
+    comparison.
+    """
+    if quick_calculation is True:
+        data = shijian.select_spread(data, 10)
+    n = len(data)
+    x_values         = []
+    y_values         = []
+    x_squared_values = []
+    xy_values        = []
+    for datum in data:
+        x = datum[0]
+        y = datum[1]
+        x_values.append(x)
+        y_values.append(y)
+        x_squared_values.append(x ** 2)
+        xy_values.append(x * y)
+    b1 = (sum(xy_values) - (sum(x_values) * sum(y_values)) / n) / \
+         (sum(x_squared_values) - (sum(x_values) ** 2) / n)
+    b0 = (sum(y_values) - b1 * sum(x_values)) / n
+    return (b0, b1)
+
+def synthetic_workload(
+    workload = "constant",
+    interval = 0.1 # s
+    ):
+    """
+    Return a list of data of fraction complete and time of a synthetic process
+    that takes 100 s at a rate of progress that changes according to the
+    specified workload: "constant", "warm-up" (a fifth of the rate for the
+    first 20 s), "stall" (no progress from 30 s to 45 s) or "slowdown" (half
+    the rate after 50 s).
+    """
+    random.seed(0)
+    rate     = 0.01 # fraction per second
+    data     = []
+    fraction = 0.0
+    time_    = 0.0
+    while fraction < 1:
+        time_ += interval
+        if workload == "warm-up" and time_ < 20:
+            rate_current = rate / 5
+        elif workload == "stall" and 30 <= time_ < 45:
+            rate_current = 0.0
+        elif workload == "slowdown" and time_ >= 50:
+            rate_current = rate / 2
+        else:
+            rate_current = rate
+        fraction += rate_current * interval * random.uniform(0.5, 1.5)
+        data.append((min(fraction, 1.0), time_))
+    return data
+
+def benchmark_progress_estimators(
+    workloads = ["constant", "warm-up", "stall", "slowdown"]
+    ):
+    """
+    Measure the time per datum of estimators of the time of completion, adding
+    a datum and estimating, and the mean absolute error of their estimates at
+    every tenth of progress, for synthetic processes with changing rates of
+    progress.
+    """
+    estimators = [
+        ("OLS",             lambda: shijian.Linear_Estimator()),
+        ("windowed OLS",    lambda: shijian.Linear_Estimator(window = 100)),
+        ("EWMA rate",       lambda: shijian.EWMA_Rate_Estimator()),
+        ("Theil-Sen",       lambda: shijian.Theil_Sen_Estimator())
+    ]
+    for workload in workloads:
+        data          = synthetic_workload(workload = workload)
+        time_complete = data[-1][1]
+        for name, estimator_factory in estimators:
+            estimator  = estimator_factory()
+            errors     = []
+            checkpoint = 0.1
+            time_start = timeit.default_timer()
+            for fraction, time_ in data:
+                estimator.add(fraction, time_)
+                if fraction >= checkpoint and checkpoint < 1:
+                    try:
+                        estimate = estimator.estimate()[0]
+                    except (ArithmeticError, ValueError):
+                        estimate = time_
+                    errors.append(abs(estimate - time_complete))
+                    checkpoint += 0.1
+            seconds = timeit.default_timer() - time_start
+            report(
+                description = "{name} estimator ({workload})".format(
+                    name     = name,
+                    workload = workload
+                ),
+                seconds     = seconds,
+                number      = len(data)
+            )
+            report(
+                description = "{name} estimator error ({workload})".format(
+                    name     = name,
+                    workload = workload
+                ),
+                seconds     = sum(errors) / len(errors),
+                number      = 1
+            )
+
+def style_datetime_object_chain(
+    datetime_object = None,
+    style           = "YYYY-MM-DDTHHMMZ"
+    ):
+    """
+    This is the if/elif chain previously used by function
+    style_datetime_object, retained for comparison.
+    """
+    if style == "YYYY-MM-DDTHHMMZ":
+        return datetime_object.strftime("%Y-%m-%dT%H%MZ")
+    elif style == "YYYY-MM-DDTHHMMSSZ":
+        return datetime_object.strftime("%Y-%m-%dT%H%M%SZ")
+    elif style == "YYYY-MM-DDTHHMMSSMMMMMMZ":
+        return datetime_object.strftime("%Y-%m-%dT%H%M%S%fZ")
+    elif style == "YYYY-MM-DD HH:MM:SS UTC":
+        return datetime_object.strftime("%Y-%m-%d %H:%M:%S UTC")
+    elif style == "YYYY-MM-DD HH:MM:SS Z":
+        return datetime_object.strftime("%Y-%m-%d %H:%M:%S Z")
+    elif style == "UNIX time S.SSSSSS":
+        return (datetime_object -\
+            datetime.datetime.utcfromtimestamp(0)).total_seconds()
+    elif style == "UNIX time S":
+        return int((datetime_object -\
+            datetime.datetime.utcfromtimestamp(0)).total_seconds())
+    elif style == "day DD month YYYY":
+        return datetime_object.strftime("%A %d %B %Y")
+    elif style == "HH:MM day DD month YYYY":
+        return datetime_object.strftime("%H:%M %A %d %B %Y")
+    elif style == "HH:MM:SS day DD month YYYY":
+        return datetime_object.strftime("%H:%M:%S %A %d %B %Y")
+    elif style == "day DD month YYYY HH:MM:SS":
+        return datetime_object.strftime("%A %d %B %Y %H:%M:%S")
+    elif style == "HH hours MM minutes SS sounds day DD month YYYY":
+        return datetime_object.strftime("%H hours %M minutes %S seconds %A %d %B %Y")
+    elif style == "DD:HH:MM":
+        return datetime_object.strftime("%d:%H:%M")
+    elif style == "DD:HH:MM:SS":
+        return datetime_object.strftime("%d:%H:%M:%S")
+    elif style == "HH:MM:SS":
+        return datetime_object.strftime("%H:%M:%S")
+    elif style == "HH hours MM minutes SS seconds":
+        return datetime_object.strftime("%H hours %M minutes %S seconds")
+    else:
+        return datetime_object.strftime("%Y-%m-%dT%H%MZ")
+
+if __name__ == '__main__':
+    main()
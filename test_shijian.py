@@ -0,0 +1,43 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+
+import pytest
+
+import shijian
+
+def test_propose_filename_keeps_directory(tmp_path):
+    directory = str(tmp_path)
+    filename  = os.path.join(directory, "data set.pkl")
+    assert shijian.propose_filename(filename = filename) ==\
+        os.path.join(directory, "data_set.pkl")
+
+def test_propose_filename_without_directory(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert shijian.propose_filename(filename = "data set.pkl") ==\
+        "data_set.pkl"
+
+def test_reserve_filename_in_directory(tmp_path):
+    directory = str(tmp_path)
+    with shijian.reserve_filename(
+        filename = os.path.join(directory, "data.pkl")
+    ) as file_reserved:
+        assert file_reserved.name == os.path.join(directory, "data.pkl")
+    assert os.listdir(directory) == ["data.pkl"]
+
+def test_clock_segments_counted_in_both_modes(monkeypatch):
+    for aggregate in (False, True):
+        monkeypatch.setattr(shijian, "clocks", shijian.Clocks())
+        if aggregate:
+            shijian.clocks.engage_aggregate_mode()
+        clock = shijian.Clock(name = "segments")
+        clock.stop()
+        clock.start()
+        clock.stop()
+        clock.stop()
+        assert shijian.clocks.statistics()["segments"].count == 2
+
+def test_progress_reporter_requires_total():
+    with pytest.raises(ValueError):
+        shijian.Progress_Reporter()